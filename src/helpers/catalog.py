@@ -0,0 +1,281 @@
+"""Header-only index of the SAC files in a directory tree."""
+
+import argparse
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from helpers.loader import ParallelLoader
+from helpers.sacfilereader import read_sac_header
+
+# Default name of the index database, kept at the top of the scanned directory
+CATALOG_NAME = ".sac_catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    path TEXT PRIMARY KEY,
+    network TEXT,
+    station TEXT,
+    location TEXT,
+    channel TEXT,
+    start REAL,
+    end REAL,
+    npts INTEGER,
+    delta REAL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS traces_channel ON traces (channel, start);
+CREATE INDEX IF NOT EXISTS traces_station ON traces (station, start);
+"""
+COLUMNS = (
+    "path",
+    "network",
+    "station",
+    "location",
+    "channel",
+    "start",
+    "end",
+    "npts",
+    "delta",
+    "mtime",
+    "size",
+)
+
+
+def read_entry(path, mtime, size):
+    """
+    Read the header of one file and return its catalog row.
+
+    Files that are not SAC files are still recorded (with empty metadata) so
+    that they are not opened again until they change.
+    """
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=path, mtime=mtime, size=size)
+    try:
+        header = read_sac_header(path)
+        start_time = header.start_time
+        npts = header.npts or 0
+        delta = header.delta or 0.0
+    except (OSError, ValueError):
+        return row
+
+    start = start_time.timestamp() if start_time else None
+    row.update(
+        network=header.knetwk,
+        station=header.kstnm,
+        location=header.khole,
+        channel=header.kcmpnm,
+        start=start,
+        end=None if start is None else start + max(npts - 1, 0) * delta,
+        npts=npts,
+        delta=delta,
+    )
+    return row
+
+
+class SacCatalog:
+    """
+    SQLite index of the headers of every SAC file below a directory.
+
+    Only the 632 header bytes of each file are read, in parallel, and files
+    are only read again when their modification time or size changes.
+    """
+
+    def __init__(self, directory, database=None, max_workers=None):
+        self.directory = os.path.abspath(directory)
+        self.max_workers = max_workers
+        self.connection = sqlite3.connect(
+            database or os.path.join(self.directory, CATALOG_NAME)
+        )
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def list_files(self):
+        """Return {path: (mtime, size)} for every file below the directory."""
+        files = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith(CATALOG_NAME):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def scan(self) -> int:
+        """
+        Bring the index up to date with the directory.
+
+        :return: Number of files whose header was (re)read
+        """
+        files = self.list_files()
+        known = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self.connection.execute("SELECT path, mtime, size FROM traces")
+        }
+
+        # Only files that are new or changed since the last scan are read
+        changed = [path for path, stat in files.items() if known.get(path) != stat]
+        removed = [(path,) for path in known if path not in files]
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            rows = list(pool.map(lambda path: read_entry(path, *files[path]), changed))
+
+        with self.connection:
+            self.connection.executemany("DELETE FROM traces WHERE path = ?", removed)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO traces VALUES ("
+                + ", ".join(":" + column for column in COLUMNS)
+                + ")",
+                rows,
+            )
+        return len(changed)
+
+    def query(
+        self,
+        network=None,
+        station=None,
+        location=None,
+        channel=None,
+        start=None,
+        end=None,
+    ):
+        """
+        Return the rows of the SAC files matching every given criterion.
+
+        :param float start: Start of a time window, as a POSIX timestamp
+        :param float end: End of a time window, as a POSIX timestamp
+        :return: List of sqlite3.Row ordered by station, channel and start time
+        """
+        clauses = ["channel IS NOT NULL"]
+        params = []
+        for column, value in (
+            ("network", network),
+            ("station", station),
+            ("location", location),
+            ("channel", channel),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        # Keep the traces overlapping the window
+        if end is not None:
+            clauses.append("start <= ?")
+            params.append(end)
+        if start is not None:
+            clauses.append("end >= ?")
+            params.append(start)
+
+        return self.connection.execute(
+            "SELECT * FROM traces WHERE "
+            + " AND ".join(clauses)
+            + " ORDER BY station, channel, start",
+            params,
+        ).fetchall()
+
+    def paths(self, **criteria):
+        """Return the paths of the SAC files matching the query() criteria."""
+        return [row["path"] for row in self.query(**criteria)]
+
+    def span(self):
+        """Return the (start, end) of the SAC files, or (None, None)."""
+        return tuple(
+            self.connection.execute(
+                "SELECT MIN(start), MAX(end) FROM traces WHERE channel IS NOT NULL"
+            ).fetchone()
+        )
+
+
+def scan_directory(directory) -> int:
+    """
+    Bring the catalog of a directory up to date, in a thread of its own.
+
+    SQLite connections belong to the thread that opened them, so the
+    catalog is opened and closed here.
+
+    :return: Number of files whose header was (re)read
+    """
+    catalog = SacCatalog(directory)
+    try:
+        return catalog.scan()
+    finally:
+        catalog.close()
+
+
+class CatalogJob(QObject):
+    """
+    Scan a directory into its catalog off the GUI thread.
+
+    The job has the signals and methods of helpers.rdseed.RdseedJob, so the
+    main window follows it like any other job.
+    """
+
+    # Create signals
+    progress = pyqtSignal(int, name="progress")
+    finished = pyqtSignal(bool, name="finished")
+
+    def __init__(self, directory, parent=None):
+        # Init the base class
+        QObject.__init__(self, parent)
+
+        # Init class variables
+        self.directory = os.path.abspath(directory)
+        self.scanned = None
+        self.error = ""
+        self.cancelled = False
+        self.running = False
+        self.loader = ParallelLoader(scan_directory, [self.directory], self, 1)
+        self.loader.loaded.connect(self._loaded)
+        self.loader.failed.connect(self._failed)
+        self.loader.finished.connect(self._finished)
+
+    def start(self) -> None:
+        self.running = True
+        self.loader.start()
+
+    def cancel(self) -> None:
+        """Stop following the scan; finished is emitted with False."""
+        if self.running:
+            self.cancelled = True
+            self.loader.cancel()
+            self._finished()
+
+    def _loaded(self, directory, scanned) -> None:
+        self.scanned = scanned
+
+    def _failed(self, directory, error) -> None:
+        self.error = error
+
+    def _finished(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        self.finished.emit(not self.cancelled and self.scanned is not None)
+
+
+def main():
+    # Create the command-line options
+    parser = argparse.ArgumentParser(description="Index the SAC files in a directory")
+    parser.add_argument("directory", help="Directory to scan")
+    parser.add_argument("-s", "--station", help="Only list this station")
+    parser.add_argument("-c", "--channel", help="Only list this channel")
+    args = parser.parse_args()
+
+    catalog = SacCatalog(args.directory)
+    print(f"Read {catalog.scan()} headers")
+    for path in catalog.paths(station=args.station, channel=args.channel):
+        print(path)
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Mean and polynomial trend removal for traces."""
+
+import numpy as np
+from numpy.polynomial import polynomial
+
+# Number of samples processed at a time, to bound temporary memory
+CHUNK_SIZE = 1 << 20
+
+
+class Trend:
+    """
+    Least-squares polynomial trend of a trace, as a function of sample index.
+
+    Sample indices are scaled to [-1, 1] over the trace before the polynomial
+    is evaluated, which keeps high orders well conditioned.
+    """
+
+    def __init__(self, coefficients, npts):
+        """
+        :param coefficients: Polynomial coefficients, lowest order first
+        :param int npts: Number of samples in the trace
+        """
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.npts = npts
+
+    @property
+    def order(self) -> int:
+        return len(self.coefficients) - 1
+
+    def scale(self, positions):
+        """Map sample positions onto [-1, 1]."""
+        return (
+            np.asarray(positions, dtype=np.float64) * (2.0 / max(self.npts - 1, 1))
+            - 1.0
+        )
+
+    def __call__(self, positions):
+        """Evaluate the trend at (fractional) sample positions."""
+        if self.order == 0:
+            return np.full(np.shape(positions), self.coefficients[0])
+        return polynomial.polyval(self.scale(positions), self.coefficients)
+
+    def remove(self, values, positions) -> None:
+        """Subtract the trend from values in place."""
+        for start in range(0, len(values), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            values[chunk] -= self(positions[chunk])
+
+    def restore(self, values, positions) -> None:
+        """Add the trend back onto values in place."""
+        for start in range(0, len(values), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            values[chunk] += self(positions[chunk])
+
+
+def linear_trends(npts, total, moment):
+    """
+    Return the mean and linear trend of a trace from two sums of its samples.
+
+    Sample indices are symmetric about the middle of the trace once scaled,
+    so the normal equations of orders 0 and 1 are diagonal.
+
+    :param int npts: Number of samples in the trace
+    :param float total: Sum of the samples
+    :param float moment: Sum of the samples times their distance, in samples,
+        to the middle of the trace
+    :return: Dictionary of Trend by order
+    """
+    if npts == 0:
+        return {0: Trend(np.zeros(1), 0), 1: Trend(np.zeros(2), 0)}
+
+    mean = total / npts
+    slope = 0.0
+    if npts > 1:
+        # Sum of the squared scaled indices is scale ** 2 * n (n^2 - 1) / 12
+        scale = 2.0 / (npts - 1)
+        slope = 12.0 * moment / (scale * npts * (npts * npts - 1.0))
+    return {0: Trend([mean], npts), 1: Trend([mean, slope], npts)}
+
+
+def fit_trends(data, orders=(0, 1)):
+    """
+    Fit polynomial trends of several orders in a single pass over the data.
+
+    The normal equations of the highest order are accumulated chunk by chunk;
+    the lower orders are solved from the leading block of the same sums.
+
+    :param numpy.ndarray data: Samples of the trace
+    :param orders: Polynomial orders to fit (0 is the mean, 1 a linear trend)
+    :return: Dictionary of Trend by order
+    """
+    npts = len(data)
+    if npts == 0:
+        return {order: Trend(np.zeros(order + 1), 0) for order in orders}
+
+    highest = max(orders)
+    scale = Trend(np.zeros(highest + 1), npts).scale
+    gram = np.zeros((highest + 1, highest + 1))
+    moments = np.zeros(highest + 1)
+    for start in range(0, npts, CHUNK_SIZE):
+        values = np.asarray(data[start : start + CHUNK_SIZE], dtype=np.float64)
+        vander = polynomial.polyvander(
+            scale(np.arange(start, start + len(values))), highest
+        )
+        gram += vander.T @ vander
+        moments += vander.T @ values
+
+    trends = {}
+    for order in orders:
+        coefficients = np.linalg.lstsq(
+            gram[: order + 1, : order + 1], moments[: order + 1], rcond=None
+        )[0]
+        trends[order] = Trend(coefficients, npts)
+    return trends
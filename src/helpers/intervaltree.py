@@ -0,0 +1,66 @@
+"""Static interval tree for time coverage queries."""
+
+import numpy as np
+
+
+class IntervalTree:
+    """
+    Half-open intervals [start, end), found by the intervals they overlap.
+
+    The intervals are sorted by start, and a complete binary tree over them
+    keeps the largest end of every subtree. Intervals that start before the
+    end of a query are a prefix of the sorted intervals, found by binary
+    search, and subtrees that all end before the start of the query are
+    skipped, so a query takes O(log n + m) for m results.
+    """
+
+    def __init__(self, starts, ends, values=None):
+        """
+        :param starts: Starts of the intervals, e.g. microseconds since the
+            epoch
+        :param ends: Ends of the intervals
+        :param values: What a query returns for each interval; its position
+            in starts by default
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        order = np.argsort(starts, kind="stable")
+        self.starts = starts[order]
+        self.ends = np.asarray(ends, dtype=np.int64)[order]
+        self.values = order if values is None else np.asarray(values)[order]
+
+        # Largest end below each node; leaves start at index size
+        self.size = 1
+        while self.size < len(self.starts):
+            self.size *= 2
+        self.max_ends = np.full(2 * self.size, np.iinfo(np.int64).min)
+        self.max_ends[self.size : self.size + len(self.ends)] = self.ends
+        first = self.size // 2
+        while first:
+            nodes = np.arange(first, 2 * first)
+            self.max_ends[nodes] = np.maximum(
+                self.max_ends[2 * nodes], self.max_ends[2 * nodes + 1]
+            )
+            first //= 2
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, start, end) -> np.ndarray:
+        """
+        Return the values of the intervals that overlap [start, end), in
+        the order of their starts.
+        """
+        stop = np.searchsorted(self.starts, end, "left")
+        found = []
+        nodes = [(1, 0, self.size)] if stop else []
+        while nodes:
+            node, first, last = nodes.pop()
+            if first >= stop or self.max_ends[node] <= start:
+                continue
+            if node >= self.size:
+                found.append(first)
+            else:
+                middle = (first + last) // 2
+                nodes.append((2 * node + 1, middle, last))
+                nodes.append((2 * node, first, middle))
+        return self.values[np.array(found, dtype=np.intp)]
@@ -0,0 +1,72 @@
+"""Load files in a thread pool, off the Qt GUI thread."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class ParallelLoader(QObject):
+    """
+    Run a loading function over a list of files in a pool of worker threads.
+
+    Results are delivered through Qt signals, which are queued to the thread
+    the loader lives in, so slots connected from the GUI thread can safely
+    create widgets. Files are reported in the order they finish.
+    """
+
+    # Create signals
+    loaded = pyqtSignal(str, object, name="loaded")
+    failed = pyqtSignal(str, str, name="failed")
+    progress = pyqtSignal(int, int, name="progress")
+    finished = pyqtSignal(name="finished")
+
+    def __init__(self, load, filenames, parent=None, max_workers=None):
+        # Init the base class
+        QObject.__init__(self, parent)
+
+        # Init class variables
+        self.load = load
+        self.filenames = list(filenames)
+        self.futures = []
+        self.done = 0
+        self.cancelled = False
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers or os.cpu_count())
+
+    def start(self) -> None:
+        """Submit every file to the pool."""
+        if not self.filenames:
+            self.finished.emit()
+            return
+        for filename in self.filenames:
+            future = self.executor.submit(self.load, filename)
+            self.futures.append(future)
+            future.add_done_callback(
+                lambda future, filename=filename: self._file_done(filename, future)
+            )
+        self.executor.shutdown(wait=False)
+
+    def cancel(self) -> None:
+        """Drop the files that have not been loaded yet."""
+        self.cancelled = True
+        for future in self.futures:
+            future.cancel()
+
+    def _file_done(self, filename, future) -> None:
+        # Runs in a worker thread; the signals are queued to the GUI thread
+        if self.cancelled or future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.loaded.emit(filename, future.result())
+        else:
+            self.failed.emit(filename, str(error))
+
+        with self.lock:
+            self.done += 1
+            done = self.done
+        self.progress.emit(done, len(self.filenames))
+        if done == len(self.filenames):
+            self.finished.emit()
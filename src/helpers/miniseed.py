@@ -0,0 +1,532 @@
+"""Read SEED and miniSEED data records without rdseed."""
+
+import argparse
+import datetime
+import struct
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+# Size of the fixed section of a data record header
+FIXED_HEADER_SIZE = 48
+
+# Fixed header after the sequence number: quality, reserved byte, station,
+# location, channel, network, start time (BTIME), number of samples, sample
+# rate factor and multiplier, activity, I/O and quality flags, number of
+# blockettes, time correction, beginning of data and first blockette
+FIXED_HEADER = "cx5s2s3s2sHHBBBxHHhhBBBBiHH"
+
+# Data encodings (blockette 1000) that can be decoded
+INT16 = 1
+INT32 = 3
+FLOAT32 = 4
+FLOAT64 = 5
+STEIM1 = 10
+STEIM2 = 11
+SAMPLE_DTYPES = {INT16: "i2", INT32: "i4", FLOAT32: "f4", FLOAT64: "f8"}
+ENCODINGS = (*SAMPLE_DTYPES, STEIM1, STEIM2)
+
+# Quality indicators of data records; control headers use V, A, S or T
+DATA_QUALITIES = (b"D", b"R", b"Q", b"M")
+
+# Differences packed in a Steim word, by (nibble, dnib): (count, bits).
+# A dnib of None means the whole word holds the differences
+STEIM1_WORDS = {(1, None): (4, 8), (2, None): (2, 16), (3, None): (1, 32)}
+STEIM2_WORDS = {
+    (1, None): (4, 8),
+    (2, 1): (1, 30),
+    (2, 2): (2, 15),
+    (2, 3): (3, 10),
+    (3, 0): (5, 6),
+    (3, 1): (6, 5),
+    (3, 2): (7, 4),
+}
+
+
+def _word_table(layouts):
+    # Look-up tables of (count, bits) indexed by nibble * 4 + dnib
+    counts = np.zeros(16, dtype=np.int64)
+    bits = np.ones(16, dtype=np.int64)
+    for (nibble, dnib), (count, width) in layouts.items():
+        for value in range(4) if dnib is None else (dnib,):
+            counts[nibble * 4 + value] = count
+            bits[nibble * 4 + value] = width
+    return counts, bits
+
+
+STEIM_TABLES = {1: _word_table(STEIM1_WORDS), 2: _word_table(STEIM2_WORDS)}
+
+
+class RecordHeader(NamedTuple):
+    """Fixed header and blockette 1000 of one data record."""
+
+    offset: int
+    network: str
+    station: str
+    location: str
+    channel: str
+    quality: str
+    start: datetime.datetime
+    npts: int
+    sample_rate: float
+    encoding: int
+    byteorder: str
+    record_length: int
+    data_offset: int
+
+    @property
+    def delta(self) -> float:
+        return 1.0 / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def end(self) -> datetime.datetime:
+        """Return the time just after the last sample."""
+        return self.start + datetime.timedelta(seconds=self.npts * self.delta)
+
+
+class Segment(NamedTuple):
+    """Samples of one channel without gaps."""
+
+    network: str
+    station: str
+    location: str
+    channel: str
+    start: datetime.datetime
+    sample_rate: float
+    data: np.ndarray
+
+    @property
+    def delta(self) -> float:
+        return 1.0 / self.sample_rate
+
+    def plot_data(self, reference=None):
+        """
+        Return the segment as the (data, b, delta) tuple that PlotWidget
+        plots, b being relative to reference (the start by default).
+        """
+        b = 0.0 if reference is None else (self.start - reference).total_seconds()
+        return (self.data, b, self.delta)
+
+
+def sample_rate(factor, multiplier) -> float:
+    """Return the sample rate given by the rate factor and multiplier."""
+    if factor == 0 or multiplier == 0:
+        return 0.0
+    if factor > 0:
+        return factor * multiplier if multiplier > 0 else -factor / multiplier
+    return -multiplier / factor if multiplier > 0 else 1.0 / (factor * multiplier)
+
+
+def header_byteorder(buffer, offset) -> str:
+    """Work out the byte order of a fixed header from its year."""
+    year = struct.unpack_from(">H", buffer, offset + 20)[0]
+    return ">" if 1900 <= year <= 2100 else "<"
+
+
+def parse_header(buffer, offset=0, record_length=None):
+    """
+    Parse the header of the record at offset.
+
+    :param buffer: SEED volume, or any object supporting the buffer protocol
+    :param int offset: Byte offset of the record
+    :param int record_length: Length of the records of the volume, used when
+        a data record has no blockette 1000
+    :return: RecordHeader, or None if the record is not a data record
+    """
+    if bytes(buffer[offset + 6 : offset + 7]) not in DATA_QUALITIES:
+        return None
+    byteorder = header_byteorder(buffer, offset)
+    (
+        quality,
+        station,
+        location,
+        channel,
+        network,
+        year,
+        day,
+        hour,
+        minute,
+        second,
+        fraction,
+        npts,
+        factor,
+        multiplier,
+        activity,
+        _,
+        _,
+        blockettes,
+        correction,
+        data_offset,
+        blockette_offset,
+    ) = struct.unpack_from(byteorder + FIXED_HEADER, buffer, offset + 6)
+
+    # Fractions of a second are in units of 100 microseconds
+    microseconds = fraction * 100
+    if not activity & 0x02:
+        microseconds += correction * 100
+
+    # Blockette 1000 holds the encoding and record length, 1001 adds
+    # microseconds to the start time
+    encoding = STEIM1
+    data_byteorder = ">"
+    position = blockette_offset
+    for _ in range(blockettes):
+        if not position:
+            break
+        kind, following = struct.unpack_from(
+            byteorder + "HH", buffer, offset + position
+        )
+        if kind == 1000:
+            encoding, word_order, exponent = struct.unpack_from(
+                "BBB", buffer, offset + position + 4
+            )
+            data_byteorder = ">" if word_order else "<"
+            record_length = 1 << exponent
+        elif kind == 1001:
+            microseconds += struct.unpack_from("b", buffer, offset + position + 5)[0]
+        position = following
+    if record_length is None:
+        raise ValueError(f"The record at byte {offset} has no blockette 1000")
+
+    start = datetime.datetime(
+        year, 1, 1, hour, minute, second, tzinfo=datetime.timezone.utc
+    ) + datetime.timedelta(days=day - 1, microseconds=microseconds)
+    return RecordHeader(
+        offset,
+        network.decode("ascii", "replace").strip(),
+        station.decode("ascii", "replace").strip(),
+        location.decode("ascii", "replace").strip(),
+        channel.decode("ascii", "replace").strip(),
+        quality.decode("ascii"),
+        start,
+        npts,
+        sample_rate(factor, multiplier),
+        encoding,
+        data_byteorder,
+        record_length,
+        data_offset,
+    )
+
+
+def volume_record_length(buffer):
+    """
+    Return the logical record length given by blockette 10 or 5 of a SEED
+    volume header, or None for miniSEED.
+    """
+    if bytes(buffer[6:7]) != b"V":
+        return None
+    kind = bytes(buffer[8:11])
+    if kind in (b"005", b"008", b"010"):
+        return 1 << int(bytes(buffer[19:21]))
+    return None
+
+
+def scan_records(buffer):
+    """
+    Return the headers of every data record of a SEED or miniSEED volume.
+
+    Control headers of full SEED volumes are skipped, using the logical
+    record length of the volume header.
+
+    :param buffer: Contents of the volume, e.g. a numpy.memmap of it
+    :rtype: list(RecordHeader)
+    """
+    records = []
+    default_length = volume_record_length(buffer)
+    offset = 0
+    size = len(buffer)
+    while offset + FIXED_HEADER_SIZE <= size:
+        header = parse_header(buffer, offset, default_length)
+        if header is not None:
+            records.append(header)
+            offset += header.record_length
+        elif default_length is not None:
+            offset += default_length
+        else:
+            raise ValueError(f"The record at byte {offset} is not a data record")
+    return records
+
+
+def _payloads(buffer, records, nbytes):
+    # Return the data sections of records as one (records, nbytes) array.
+    # Records that follow each other in the volume are viewed, not copied
+    data = np.frombuffer(buffer, np.uint8)
+    starts = np.array([r.offset + r.data_offset for r in records], dtype=np.int64)
+    step = records[0].record_length
+    if np.all(np.diff(starts) == step):
+        end = starts[0] + len(records) * step
+        if end <= len(data):
+            return data[starts[0] : end].reshape(len(records), step)[:, :nbytes]
+    return data[starts[:, None] + np.arange(nbytes)]
+
+
+def _sign_extend(values, bits):
+    half = 1 << (bits - 1)
+    return (values ^ half) - half
+
+
+def decode_steim(frames, npts, version=1, byteorder=">"):
+    """
+    Decode the Steim frames of several records at once.
+
+    The nibble (and, for Steim-2, the dnib) of every word gives the number
+    and width of the differences packed in it. All words are unpacked at
+    once with array shifts, and the samples are the cumulative sum of the
+    differences, restarted at the forward integration constant of each
+    record.
+
+    :param numpy.ndarray frames: uint8 array of shape (records, 64 * frames)
+    :param numpy.ndarray npts: Number of samples in each record
+    :param int version: 1 for Steim-1, 2 for Steim-2
+    :param str byteorder: Byte order of the words
+    :return: Samples of all records, one after the other, as int32
+    """
+    npts = np.asarray(npts, dtype=np.int64)
+    records = len(frames)
+    words = (
+        np.ascontiguousarray(frames)
+        .view(byteorder + "u4")
+        .astype(np.int64)
+        .reshape(records, -1)
+    )
+    nwords = words.shape[1]
+
+    # Two bits per word, from the control word at the start of every frame
+    control = words[:, ::16]
+    nibbles = (control[:, :, None] >> np.arange(30, -1, -2)) & 3
+    nibbles = nibbles.reshape(records, nwords)
+    nibbles[:, ::16] = 0  # Control words
+    nibbles[:, 1:3] = 0  # Integration constants in the first frame
+    x0 = _sign_extend(words[:, 1], 32)
+
+    # Unpack every word into up to 7 differences, most significant first
+    flat_words = words.ravel()
+    table_counts, table_bits = STEIM_TABLES[version]
+    kinds = nibbles.ravel() * 4 + (flat_words >> 30)
+    counts = table_counts[kinds]
+    packed = counts > 0
+    packed_counts = counts[packed][:, None]
+    bits = table_bits[kinds[packed]][:, None]
+    column = np.arange(7)
+    valid = column < packed_counts
+    shifts = np.where(valid, (packed_counts - 1 - column) * bits, 0)
+    values = (flat_words[packed][:, None] >> shifts) & ((1 << bits) - 1)
+    diffs = _sign_extend(values, bits)[valid]
+
+    # Keep the first npts differences of each record
+    available = counts.reshape(records, nwords).sum(axis=1)
+    if np.any(available < npts):
+        raise ValueError("A Steim record holds fewer differences than samples")
+    first = np.concatenate(([0], np.cumsum(available)[:-1]))
+    position = np.arange(len(diffs)) - np.repeat(first, available)
+    diffs = diffs[position < np.repeat(npts, available)]
+
+    # The first difference of a record is replaced so that the running sum
+    # starts again from its integration constant
+    keep = npts > 0
+    starts = np.concatenate(([0], np.cumsum(npts)[:-1]))[keep]
+    if not len(starts):
+        return np.empty(0, dtype=np.int32)
+    x0 = x0[keep]
+    inner = np.add.reduceat(diffs, starts) - diffs[starts]
+    last = x0 + inner
+    diffs[starts[0]] = x0[0]
+    diffs[starts[1:]] = x0[1:] - last[:-1]
+    return np.cumsum(diffs).astype(np.int32)
+
+
+def decode_records(buffer, records):
+    """
+    Decode the samples of records, one after the other.
+
+    Records with the same encoding and layout are decoded together.
+
+    :param buffer: Contents of the volume
+    :param list records: RecordHeader of the records to decode
+    :rtype: numpy.ndarray
+    """
+    npts = np.array([r.npts for r in records], dtype=np.int64)
+    ends = np.cumsum(npts)
+    groups = {}
+    for index, record in enumerate(records):
+        layout = (
+            record.encoding,
+            record.byteorder,
+            record.record_length - record.data_offset,
+        )
+        groups.setdefault(layout, []).append(index)
+
+    decoded = []
+    for (encoding, byteorder, nbytes), indices in groups.items():
+        group = [records[i] for i in indices]
+        if encoding in (STEIM1, STEIM2):
+            frames = _payloads(buffer, group, nbytes - nbytes % 64)
+            values = decode_steim(
+                frames, npts[indices], encoding - STEIM1 + 1, byteorder
+            )
+        elif encoding in SAMPLE_DTYPES:
+            dtype = np.dtype(byteorder + SAMPLE_DTYPES[encoding])
+            payload = _payloads(buffer, group, nbytes - nbytes % dtype.itemsize)
+            samples = np.ascontiguousarray(payload).view(dtype)
+            values = samples[np.arange(samples.shape[1]) < npts[indices, None]]
+            values = values.astype(dtype.newbyteorder("="))
+        else:
+            raise ValueError(f"Encoding {encoding} is not supported")
+        decoded.append((indices, values))
+
+    # Put the groups back in record order
+    if len(decoded) == 1:
+        return decoded[0][1]
+    samples = np.empty(ends[-1], dtype=np.result_type(*[v for _, v in decoded]))
+    for indices, values in decoded:
+        position = 0
+        for i in indices:
+            samples[ends[i] - npts[i] : ends[i]] = values[position : position + npts[i]]
+            position += npts[i]
+    return samples
+
+
+def read_segments(buffer, records):
+    """
+    Decode records of one channel into segments without gaps.
+
+    A record continues the current segment if it starts within half a
+    sample of where the segment ends.
+
+    :rtype: list(Segment)
+    """
+    records = sorted(
+        (r for r in records if r.npts and r.sample_rate), key=lambda r: r.start
+    )
+    if not records:
+        return []
+    samples = decode_records(buffer, records)
+
+    segments = []
+    first = 0
+    position = 0
+    for i, record in enumerate(records):
+        if i > first:
+            previous = records[i - 1]
+            gap = (record.start - previous.end).total_seconds()
+            if record.sample_rate != previous.sample_rate or (
+                abs(gap) > 0.5 * previous.delta
+            ):
+                segments.append(
+                    _segment(records[first], samples, position, records[first:i])
+                )
+                position += sum(r.npts for r in records[first:i])
+                first = i
+    segments.append(_segment(records[first], samples, position, records[first:]))
+    return segments
+
+
+def _segment(record, samples, position, records):
+    npts = sum(r.npts for r in records)
+    return Segment(
+        record.network,
+        record.station,
+        record.location,
+        record.channel,
+        record.start,
+        record.sample_rate,
+        samples[position : position + npts],
+    )
+
+
+def read_miniseed(
+    filename,
+    network=None,
+    station=None,
+    location=None,
+    channel=None,
+    start=None,
+    end=None,
+):
+    """
+    Read the samples of a channel from a SEED or miniSEED file.
+
+    :param str filename: Path to the volume
+    :param datetime.datetime start: Start of the window, in UTC
+    :param datetime.datetime end: End of the window, in UTC
+    :return: Segments of the matching channels, trimmed to the window
+    :rtype: list(Segment)
+    """
+    buffer = np.memmap(filename, np.uint8, "r")
+    records = [
+        r
+        for r in scan_records(buffer)
+        if (network is None or r.network == network)
+        and (station is None or r.station == station)
+        and (location is None or r.location == location)
+        and (channel is None or r.channel == channel)
+        and (start is None or r.end > start)
+        and (end is None or r.start <= end)
+    ]
+
+    # Decode each channel separately
+    channels = {}
+    for record in records:
+        key = (record.network, record.station, record.location, record.channel)
+        channels.setdefault(key, []).append(record)
+    segments = []
+    for channel_records in channels.values():
+        for segment in read_segments(buffer, channel_records):
+            segment = trim_segment(segment, start, end)
+            if len(segment.data):
+                segments.append(segment)
+    return segments
+
+
+def trim_segment(segment, start=None, end=None):
+    """Return the samples of a segment between start and end."""
+    first = 0
+    stop = len(segment.data)
+    if start is not None:
+        offset = (start - segment.start).total_seconds() * segment.sample_rate
+        first = min(max(int(np.ceil(offset - 1e-3)), 0), stop)
+    if end is not None:
+        offset = (end - segment.start).total_seconds() * segment.sample_rate
+        stop = min(max(int(np.floor(offset + 1e-3)) + 1, first), stop)
+    return segment._replace(
+        start=segment.start + datetime.timedelta(seconds=first * segment.delta),
+        data=segment.data[first:stop],
+    )
+
+
+def main():
+    # Create the command-line options
+    parser = argparse.ArgumentParser(description="Read a SEED or miniSEED file")
+    parser.add_argument("filename", help="SEED or miniSEED file to read")
+    parser.add_argument(
+        "-b",
+        "--benchmark",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Decode the file N times and report the samples per second",
+    )
+    args = parser.parse_args()
+
+    buffer = np.memmap(args.filename, np.uint8, "r")
+    records = scan_records(buffer)
+    for segment in read_miniseed(args.filename):
+        print(
+            f"{segment.network}.{segment.station}.{segment.location}."
+            f"{segment.channel} {segment.start.isoformat()}"
+            f" {segment.sample_rate} Hz npts = {len(segment.data)}"
+        )
+
+    if args.benchmark:
+        started = time.perf_counter()
+        for _ in range(args.benchmark):
+            samples = decode_records(buffer, records)
+        elapsed = time.perf_counter() - started
+        rate = len(samples) * args.benchmark / elapsed
+        print(f"Decoded {len(samples)} samples {args.benchmark} times:")
+        print(f"{rate:,.0f} samples per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Min/max level-of-detail pyramid for drawing long traces."""
+
+import numpy as np
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max envelope of a trace.
+
+    Level 0 is the trace itself. Each level above it keeps the minimum and
+    maximum of bins that are ``factor`` times wider than the bins of the level
+    below, so level k summarizes ``factor ** k`` samples per bin. Drawing the
+    envelope of a level with at least one bin per pixel column covers the same
+    pixels as drawing every sample.
+    """
+
+    def __init__(self, data, factor=8, min_bins=512, levels=None):
+        """
+        :param numpy.ndarray data: Samples of the trace
+        :param int factor: Number of bins of a level merged into one bin of
+            the next level
+        :param int min_bins: Stop adding levels once a level has fewer bins
+        :param list levels: (mins, maxs) of the levels above level 0, when
+            they are already known, as in ChunkStats.levels
+        """
+        self.data = data
+        self.factor = factor
+        self.levels = [(data, data)]
+
+        mins, maxs = data, data
+        for low, high in levels or ():
+            if len(mins) <= min_bins * factor:
+                return
+            mins, maxs = low, high
+            self.levels.append((mins, maxs))
+        if levels is not None:
+            return
+
+        # Each level is reduced from the one below it, so the raw samples are
+        # only scanned once
+        while len(mins) > min_bins * factor:
+            starts = np.arange(0, len(mins), factor)
+            mins = np.minimum.reduceat(mins, starts).astype(np.float32)
+            maxs = np.maximum.reduceat(maxs, starts).astype(np.float32)
+            self.levels.append((mins, maxs))
+
+    def __len__(self):
+        return len(self.data)
+
+    def bin_size(self, level) -> int:
+        """Return the number of samples summarized by one bin of a level."""
+        return self.factor**level
+
+    def level_for(self, samples, columns) -> int:
+        """
+        Return the coarsest level that still has a bin per pixel column.
+
+        :param int samples: Number of samples to draw
+        :param int columns: Width of the plot canvas in pixels
+        """
+        level = 0
+        while (
+            level + 1 < len(self.levels)
+            and samples // self.bin_size(level + 1) >= columns
+        ):
+            level += 1
+        return level
+
+    def envelope(self, level, first=0, stop=None):
+        """
+        Return the points to draw for samples first to stop of a level.
+
+        Each bin becomes two points at the position of its centre: its minimum
+        and its maximum, so the polyline draws a vertical stroke per bin. At
+        level 0 the samples themselves are returned.
+
+        :param int level: Pyramid level
+        :param int first: Index of the first sample
+        :param int stop: Index after the last sample
+        :return: Tuple of (positions, values), positions being fractional
+            sample indices
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        stop = len(self.data) if stop is None else stop
+        if level == 0:
+            return (np.arange(first, stop, dtype=np.float64), self.data[first:stop])
+
+        size = self.bin_size(level)
+        mins, maxs = self.levels[level]
+        bin_first = first // size
+        bin_stop = min(-(-stop // size), len(mins))
+
+        centres = np.arange(bin_first, bin_stop) * float(size) + (size - 1) / 2
+        positions = np.repeat(centres, 2)
+        values = np.empty(2 * (bin_stop - bin_first), dtype=np.float32)
+        values[0::2] = mins[bin_first:bin_stop]
+        values[1::2] = maxs[bin_first:bin_stop]
+        return (positions, values)
@@ -0,0 +1,123 @@
+"""Run rdseed in the background with QProcess."""
+
+import re
+
+from PyQt6.QtCore import QObject, QProcess, pyqtSignal
+
+RDSEED = "rdseed"
+
+# rdseed reports every file it writes, e.g.
+# "Writing IU.ANMO.00.BHZ.M.SAC, 86400 samples (binary), starting ..."
+WRITING = re.compile(r"^\s*Writing\s+(\S+?),")
+
+
+def extraction_answers(seed_name, channels, start, end) -> str:
+    """
+    Return the answers to rdseed's prompts that extract SAC files.
+
+    :param str seed_name: SEED volume to read
+    :param str channels: Space separated channels, or "" for all of them
+    :param str start: Start time in rdseed format (yyyy,ddd,hh:mm:ss.ffff)
+    :param str end: End time in rdseed format
+    """
+    return (
+        seed_name
+        + "\n\n\nd\n\n\n"
+        + channels
+        + "\n\n\n\n\n\n\n\n"
+        + start
+        + "\n"
+        + end
+        + "\n\n\nQuit\n"
+    )
+
+
+class RdseedJob(QObject):
+    """
+    One run of rdseed, started without a shell and without blocking.
+
+    The answers to rdseed's prompts are written to its stdin, and its stdout
+    is read line by line as it arrives. Every job has its own QProcess, so
+    several jobs can run at the same time.
+    """
+
+    # Create signals
+    output = pyqtSignal(str, name="output")
+    progress = pyqtSignal(int, name="progress")
+    finished = pyqtSignal(bool, name="finished")
+
+    def __init__(self, arguments=(), answers="", directory=None, parent=None):
+        """
+        :param arguments: Command line arguments of rdseed
+        :param str answers: Text written to rdseed's stdin
+        :param str directory: Working directory, where rdseed writes its files
+        """
+        # Init the base class
+        QObject.__init__(self, parent)
+
+        # Init class variables
+        self.arguments = list(arguments)
+        self.answers = answers
+        self.lines = []
+        self.written = []
+        self.error = ""
+        self.cancelled = False
+        self.partial = b""
+        self.process = QProcess(self)
+        if directory is not None:
+            self.process.setWorkingDirectory(str(directory))
+
+        self.process.readyReadStandardOutput.connect(self._read_output)
+        self.process.finished.connect(self._process_finished)
+        self.process.errorOccurred.connect(self._process_error)
+
+    @property
+    def running(self) -> bool:
+        return self.process.state() != QProcess.ProcessState.NotRunning
+
+    def start(self) -> None:
+        """Start rdseed and hand it the answers to its prompts."""
+        self.process.start(RDSEED, self.arguments)
+        if self.answers:
+            self.process.write(self.answers.encode())
+        self.process.closeWriteChannel()
+
+    def cancel(self) -> None:
+        """Stop rdseed; finished is emitted with False once it has exited."""
+        if self.running:
+            self.cancelled = True
+            self.process.kill()
+
+    def _read_output(self) -> None:
+        # Lines may arrive split over several reads
+        text = self.partial + bytes(self.process.readAllStandardOutput())
+        *complete, self.partial = text.split(b"\n")
+        for raw in complete:
+            self._add_line(raw.decode(errors="replace").rstrip("\r"))
+
+    def _add_line(self, line) -> None:
+        self.lines.append(line)
+        self.output.emit(line)
+        match = WRITING.match(line)
+        if match:
+            self.written.append(match.group(1))
+            self.progress.emit(len(self.written))
+
+    def _process_finished(self, exit_code, exit_status) -> None:
+        # Keep the last line, even without a newline
+        self._read_output()
+        if self.partial:
+            self._add_line(self.partial.decode(errors="replace"))
+            self.partial = b""
+        self.error = bytes(self.process.readAllStandardError()).decode(errors="replace")
+        self.finished.emit(
+            not self.cancelled
+            and exit_status == QProcess.ExitStatus.NormalExit
+            and exit_code == 0
+        )
+
+    def _process_error(self, error) -> None:
+        # A program that cannot be started never sends finished()
+        if error == QProcess.ProcessError.FailedToStart:
+            self.error = self.process.errorString()
+            self.finished.emit(False)
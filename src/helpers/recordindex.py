@@ -0,0 +1,287 @@
+"""Byte-offset index of the data records of a SEED volume."""
+
+import argparse
+import datetime
+import os
+import time
+
+import numpy as np
+
+from helpers.miniseed import (
+    ENCODINGS,
+    RecordHeader,
+    read_segments,
+    scan_records,
+    trim_segment,
+)
+
+# Suffix of the sidecar file saved next to the volume
+INDEX_SUFFIX = ".idx.npz"
+
+# Increase when RECORD_DTYPE changes, so old sidecar files are rebuilt
+INDEX_VERSION = 1
+
+# One row per data record. Start times are integer microseconds since the
+# epoch, so that they survive the round trip through the sidecar exactly
+RECORD_DTYPE = np.dtype(
+    [
+        ("network", "U2"),
+        ("station", "U5"),
+        ("location", "U2"),
+        ("channel", "U3"),
+        ("quality", "U1"),
+        ("start", "i8"),
+        ("end", "i8"),
+        ("npts", "i4"),
+        ("sample_rate", "f8"),
+        ("encoding", "i2"),
+        ("byteorder", "U1"),
+        ("record_length", "i4"),
+        ("data_offset", "i4"),
+        ("offset", "i8"),
+    ]
+)
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Quality codes in the order they are preferred when a channel was recorded
+# in several: quality controlled, merged, indeterminate, then raw
+QUALITY_ORDER = ("Q", "M", "D", "R")
+
+
+def to_microseconds(time_value) -> int:
+    """Return a UTC datetime as microseconds since the epoch."""
+    return (time_value - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def from_microseconds(microseconds) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=int(microseconds))
+
+
+def quality_rank(quality) -> int:
+    """Return the rank of a quality code in QUALITY_ORDER, unknown ones last."""
+    return (
+        QUALITY_ORDER.index(quality) if quality in QUALITY_ORDER else len(QUALITY_ORDER)
+    )
+
+
+def sidecar_name(filename) -> str:
+    return str(filename) + INDEX_SUFFIX
+
+
+class RecordIndex:
+    """
+    Network, station, location, channel, time and byte offset of every data
+    record of a volume.
+
+    Rows are sorted by channel and start time, so the records of a channel
+    that overlap a time window are found with two binary searches, and only
+    those records are read from the volume. Records may overlap, so the end
+    times are searched through their running maximum.
+
+    A channel that holds records of several qualities is read in the best
+    of them (see QUALITY_ORDER), so that versions of the same samples are
+    not mixed into one trace.
+    """
+
+    def __init__(self, filename, rows):
+        """
+        :param str filename: Path to the SEED volume
+        :param numpy.ndarray rows: Records, as a RECORD_DTYPE array
+        """
+        self.filename = str(filename)
+        self.rows = np.sort(
+            rows, order=["network", "station", "location", "channel", "start"]
+        )
+
+        # Rows of each channel, found where any part of the code changes
+        fields = ("network", "station", "location", "channel")
+        changed = np.zeros(max(len(self.rows) - 1, 0), dtype=bool)
+        for field in fields:
+            changed |= self.rows[field][1:] != self.rows[field][:-1]
+        bounds = np.concatenate(([0], np.flatnonzero(changed) + 1, [len(self.rows)]))
+        self.channels = {}
+        self.qualities = {}
+        self.max_ends = np.empty(len(self.rows), dtype=np.int64)
+        for first, stop in zip(bounds[:-1], bounds[1:]):
+            if stop > first:
+                key = tuple(str(self.rows[field][first]) for field in fields)
+                self.channels[key] = (int(first), int(stop))
+                self.max_ends[first:stop] = np.maximum.accumulate(
+                    self.rows["end"][first:stop]
+                )
+                present = np.unique(self.rows["quality"][first:stop])
+                if len(present) > 1:
+                    self.qualities[key] = str(min(present, key=quality_rank))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def decodable(self) -> bool:
+        """Return whether every record uses an encoding read() can decode."""
+        return bool(np.isin(self.rows["encoding"], ENCODINGS).all())
+
+    @classmethod
+    def build(cls, filename):
+        """Index a volume by scanning the header of every record once."""
+        buffer = np.memmap(filename, np.uint8, "r")
+        records = scan_records(buffer)
+        rows = np.empty(len(records), dtype=RECORD_DTYPE)
+        for i, record in enumerate(records):
+            start = to_microseconds(record.start)
+            rows[i] = (
+                record.network,
+                record.station,
+                record.location,
+                record.channel,
+                record.quality,
+                start,
+                start + round(record.npts * record.delta * 1e6),
+                record.npts,
+                record.sample_rate,
+                record.encoding,
+                record.byteorder,
+                record.record_length,
+                record.data_offset,
+                record.offset,
+            )
+        return cls(filename, rows)
+
+    @classmethod
+    def open(cls, filename, save=True):
+        """
+        Return the index of a volume, from its sidecar file if that is still
+        valid, or by scanning the volume.
+
+        The sidecar is valid while the modification time and size of the
+        volume are the ones it was built for.
+
+        :param str filename: Path to the SEED volume
+        :param bool save: Write a new sidecar when the volume was scanned
+        """
+        stat = os.stat(filename)
+        try:
+            with np.load(sidecar_name(filename), allow_pickle=False) as sidecar:
+                if tuple(sidecar["stamp"]) == (
+                    INDEX_VERSION,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ):
+                    return cls(filename, sidecar["rows"])
+        except (OSError, KeyError, ValueError):
+            pass
+
+        index = cls.build(filename)
+        if save:
+            index.save(stat)
+        return index
+
+    def save(self, stat=None) -> None:
+        """Write the sidecar file; volumes in read-only places stay unindexed."""
+        stat = os.stat(self.filename) if stat is None else stat
+        stamp = np.array([INDEX_VERSION, stat.st_mtime_ns, stat.st_size], np.int64)
+        try:
+            with open(sidecar_name(self.filename), "wb") as output:
+                np.savez(output, stamp=stamp, rows=self.rows)
+        except OSError:
+            pass
+
+    def find(
+        self, network, station, location, channel, start=None, end=None, quality=None
+    ):
+        """
+        Return the rows of a channel that overlap a time window.
+
+        :param datetime.datetime start: Start of the window, in UTC
+        :param datetime.datetime end: End of the window, in UTC
+        :param str quality: Quality of the records to return, by default the
+            best one of the channel
+        :rtype: numpy.ndarray
+        """
+        key = (network, station, location, channel)
+        first, stop = self.channels.get(key, (0, 0))
+        rows = self.rows[first:stop]
+        ends = self.max_ends[first:stop]
+        quality = self.qualities.get(key) if quality is None else quality
+        if quality is not None:
+            rows = rows[rows["quality"] == quality]
+            ends = np.maximum.accumulate(rows["end"])
+
+        # Records may overlap, so the first record that ends after the start
+        # is found in the running maximum of the ends, which is sorted
+        if start is not None:
+            first = np.searchsorted(ends, to_microseconds(start), "right")
+            rows = rows[first:]
+        if end is not None:
+            stop = np.searchsorted(rows["start"], to_microseconds(end), "right")
+            rows = rows[:stop]
+
+        # Shorter records under a long one may still end before the start
+        if start is not None:
+            rows = rows[rows["end"] > to_microseconds(start)]
+
+        # Records written twice are read once
+        if len(rows) > 1:
+            rows = rows[np.concatenate(([True], np.diff(rows["start"]) != 0))]
+        return rows
+
+    def records(
+        self, network, station, location, channel, start=None, end=None, quality=None
+    ):
+        """Return the headers of the records find() selects."""
+        return [
+            RecordHeader(
+                int(row["offset"]),
+                str(row["network"]),
+                str(row["station"]),
+                str(row["location"]),
+                str(row["channel"]),
+                str(row["quality"]),
+                from_microseconds(row["start"]),
+                int(row["npts"]),
+                float(row["sample_rate"]),
+                int(row["encoding"]),
+                str(row["byteorder"]),
+                int(row["record_length"]),
+                int(row["data_offset"]),
+            )
+            for row in self.find(
+                network, station, location, channel, start, end, quality
+            )
+        ]
+
+    def read(
+        self, network, station, location, channel, start=None, end=None, quality=None
+    ):
+        """
+        Read a channel between two times, decoding only its records there.
+
+        :rtype: list(helpers.miniseed.Segment)
+        """
+        records = self.records(network, station, location, channel, start, end, quality)
+        buffer = np.memmap(self.filename, np.uint8, "r")
+        segments = [
+            trim_segment(segment, start, end)
+            for segment in read_segments(buffer, records)
+        ]
+        return [segment for segment in segments if len(segment.data)]
+
+
+def main():
+    # Create the command-line options
+    parser = argparse.ArgumentParser(description="Index the records of a SEED file")
+    parser.add_argument("filename", help="SEED or miniSEED file to index")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = RecordIndex.open(args.filename)
+    elapsed = time.perf_counter() - started
+    print(f"{len(index)} records in {elapsed * 1000:.1f} ms")
+    for key, (first, stop) in index.channels.items():
+        start = from_microseconds(index.rows["start"][first])
+        end = from_microseconds(index.max_ends[stop - 1])
+        print(f"{'.'.join(key)} {start.isoformat()} {end.isoformat()} {stop - first}")
+
+
+if __name__ == "__main__":
+    main()
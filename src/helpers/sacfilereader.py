@@ -1,45 +1,245 @@
 import argparse
-import struct
-import sys
+import datetime
+import math
+import os
 
+import numpy as np
 
-# Assumes little-endianness
-def sac_reader(filename):
-    data = []
-    with open(filename.strip(), "rb") as input_file:
-        # Read the header information
+# The SAC header is 158 4-byte words; the data section starts right after it
+HEADER_SIZE = 632
+
+# Value SAC uses to mark an undefined header variable
+UNDEFINED = -12345
+
+# Header variable names in file order: 70 floats, 40 integers/enums/logicals
+# and 23 character variables (KEVNM is twice as long as the others)
+FLOAT_FIELDS = (
+    ["delta", "depmin", "depmax", "scale", "odelta", "b", "e", "o", "a", "fmt"]
+    + [f"t{i}" for i in range(10)]
+    + ["f"]
+    + [f"resp{i}" for i in range(10)]
+    + ["stla", "stlo", "stel", "stdp", "evla", "evlo", "evel", "evdp", "mag"]
+    + [f"user{i}" for i in range(10)]
+    + ["dist", "az", "baz", "gcarc", "sb", "sdelta", "depmen", "cmpaz", "cmpinc"]
+    + ["xminimum", "xmaximum", "yminimum", "ymaximum"]
+    + [f"unused{i}" for i in range(6, 13)]
+)
+INT_FIELDS = (
+    ["nzyear", "nzjday", "nzhour", "nzmin", "nzsec", "nzmsec", "nvhdr"]
+    + ["norid", "nevid", "npts", "nsnpts", "nwfid", "nxsize", "nysize", "unused15"]
+    + ["iftype", "idep", "iztype", "unused16", "iinst", "istreg", "ievreg"]
+    + ["ievtyp", "iqual", "isynth", "imagtyp", "imagsrc"]
+    + [f"unused{i}" for i in range(19, 27)]
+    + ["leven", "lpspol", "lovrok", "lcalda", "unused27"]
+)
+CHAR_FIELDS = (
+    ["kstnm", "kevnm", "khole", "ko", "ka"]
+    + [f"kt{i}" for i in range(10)]
+    + ["kf", "kuser0", "kuser1", "kuser2", "kcmpnm", "knetwk", "kdatrd", "kinst"]
+)
+
+# Byte offset of NVHDR, used to work out the byte order of a file
+NVHDR_OFFSET = 4 * (len(FLOAT_FIELDS) + INT_FIELDS.index("nvhdr"))
+SUPPORTED_VERSIONS = (6, 7)
+
+
+def header_dtype(byteorder="<"):
+    """
+    Return the NumPy structured dtype of a SAC header.
+
+    :param str byteorder: "<" for little-endian, ">" for big-endian
+    :rtype: numpy.dtype
+    """
+    fields = [(name, byteorder + "f4") for name in FLOAT_FIELDS]
+    fields += [(name, byteorder + "i4") for name in INT_FIELDS]
+    fields += [(name, "S16" if name == "kevnm" else "S8") for name in CHAR_FIELDS]
+    return np.dtype(fields)
+
+
+def detect_byteorder(raw) -> str:
+    """
+    Work out the byte order of a SAC header from its NVHDR variable.
+
+    :param bytes raw: The 632 header bytes
+    :return: "<" for little-endian, ">" for big-endian
+    """
+    for byteorder in ("<", ">"):
+        version = int(np.frombuffer(raw, byteorder + "i4", 1, NVHDR_OFFSET)[0])
+        if version in SUPPORTED_VERSIONS:
+            return byteorder
+    raise ValueError("Not a SAC file: unrecognized header version")
+
+
+class SacHeader:
+    """
+    SAC header parsed lazily from its raw bytes.
+
+    Header variables are available as attributes named as in the SAC manual
+    (``header.delta``, ``header.npts``, ``header.kstnm``, ...). Undefined
+    variables are returned as None.
+    """
+
+    __slots__ = ("byteorder", "_raw", "_record")
+
+    def __init__(self, raw, byteorder=None):
+        if len(raw) < HEADER_SIZE:
+            raise ValueError("Not a SAC file: header is too short")
+        self._raw = bytes(raw[:HEADER_SIZE])
+        self.byteorder = byteorder or detect_byteorder(self._raw)
+        self._record = None
+
+    def __getattr__(self, name):
+        # Only called for header variables; the slots are found normally
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._record is None:
+            self._record = np.frombuffer(self._raw, header_dtype(self.byteorder))[0]
         try:
-            # Get beginning value of the independent variable
-            input_file.seek(20)
-            binary = struct.unpack("<f", input_file.read(4))
-            # Get LEVEN variable to see if data is evenly spaced
-            input_file.seek(420)
-            leven = struct.unpack("<i", input_file.read(4))
-            if not leven:
-                print("The data in this SAC file is not evenly spaced.")
-                sys.exit(2)
-            # Get the increment between evenly spaced samples
-            input_file.seek(0)
-            delta = struct.unpack("<f", input_file.read(4))
-            # Get all of the data and store it to memory
-            input_file.seek(632)
-            byte = input_file.read(4)
-            while byte != "":
-                data.append(struct.unpack("<f", byte)[0])
-                byte = input_file.read(4)
-        except Exception as err:
-            raise err
-    return (data, binary[0], delta[0])
+            value = self._record[name]
+        except (KeyError, ValueError):
+            raise AttributeError(name) from None
+        if isinstance(value, bytes):
+            value = value.decode("ascii", "replace").strip()
+            return None if value == str(UNDEFINED) else value
+        value = value.item()
+        return None if value == UNDEFINED else value
+
+    @property
+    def reference_time(self):
+        """Return the reference time (the NZ variables) as a UTC datetime."""
+        if self.nzyear is None or self.nzjday is None:
+            return None
+        return datetime.datetime(
+            self.nzyear, 1, 1, tzinfo=datetime.timezone.utc
+        ) + datetime.timedelta(
+            days=self.nzjday - 1,
+            hours=self.nzhour or 0,
+            minutes=self.nzmin or 0,
+            seconds=self.nzsec or 0,
+            milliseconds=self.nzmsec or 0,
+        )
+
+    @property
+    def start_time(self):
+        """Return the time of the first sample as a UTC datetime."""
+        reference = self.reference_time
+        if reference is None:
+            return None
+        return reference + datetime.timedelta(seconds=self.b or 0.0)
+
+
+def read_sac_header(filename) -> SacHeader:
+    """
+    Read only the header of a SAC file.
+
+    :param str filename: Path to the SAC file
+    :rtype: SacHeader
+    """
+    with open(filename.strip(), "rb") as input_file:
+        return SacHeader(input_file.read(HEADER_SIZE))
+
+
+def sample_window(b, delta, npts, start=None, end=None):
+    """
+    Convert a time window into the range of samples that fall inside it.
+
+    :param float b: Time of the first sample
+    :param float delta: Sample interval
+    :param int npts: Number of samples
+    :param float start: Start of the window, in the same units as b
+    :param float end: End of the window, in the same units as b
+    :return: Tuple of (first, stop) sample indices, stop being exclusive
+    """
+    # DELTA is single precision, so samples within a thousandth of a sample
+    # interval of the window edges are counted as inside it
+    first = 0 if start is None else math.ceil((start - b) / delta - 1e-3)
+    stop = npts if end is None else math.floor((end - b) / delta + 1e-3) + 1
+    first = min(max(first, 0), npts)
+    return (first, min(max(stop, first), npts))
+
+
+def sac_reader(filename, start=None, end=None, header=None):
+    """
+    Read a SAC file, or only the part of it between start and end.
+
+    The data section is memory-mapped as a float32 array in the byte order of
+    the file, so opening a file is cheap and samples are only paged in from
+    disk once they are touched. Big-endian files are swapped by NumPy as the
+    array is used rather than converted up front. When a window is given only
+    the samples inside it are mapped.
+
+    :param str filename: Path to the SAC file
+    :param float start: Start of the window, in seconds relative to the
+        reference time like B
+    :param float end: End of the window, in seconds relative to the
+        reference time like B
+    :param SacHeader header: Header of the file, if it was read already
+    :return: Tuple of (data, b, delta), b being the time of the first
+        returned sample
+    :rtype: tuple(numpy.ndarray, float, float)
+    """
+    filename = filename.strip()
+    header = read_sac_header(filename) if header is None else header
+    if not header.leven:
+        raise ValueError(f"The data in {filename} is not evenly spaced.")
+
+    # Check the number of samples against the size of the data section
+    npts = header.npts or 0
+    available = (os.path.getsize(filename) - HEADER_SIZE) // 4
+    if npts > available:
+        raise ValueError(
+            f"{filename} is truncated: NPTS is {npts} but only"
+            f" {available} samples are present"
+        )
+
+    # Work out which samples are inside the window
+    b = header.b or 0.0
+    delta = header.delta
+    first, stop = sample_window(b, delta, npts, start, end)
+
+    # Map the samples without reading them
+    dtype = np.dtype(header.byteorder + "f4")
+    if stop == first:
+        data = np.empty(0, dtype=dtype)
+    else:
+        offset = HEADER_SIZE + first * dtype.itemsize
+        data = np.memmap(filename, dtype, "r", offset, (stop - first,))
+    return (data, b + first * delta, delta)
+
+
+def read_window(filename, start, end, header=None):
+    """
+    Read only the part of a SAC file between two UTC times.
+
+    The window is converted to the reference time of the file, so files
+    with different reference times line up once read.
+
+    :param str filename: Path to the SAC file
+    :param datetime.datetime start: Start of the window, in UTC
+    :param datetime.datetime end: End of the window, in UTC
+    :param SacHeader header: Header of the file, if it was read already
+    :return: Tuple of (data, b, delta), b being seconds since start; files
+        without a reference time are read whole, with their own b
+    """
+    header = read_sac_header(filename) if header is None else header
+    reference = header.reference_time
+    if reference is None:
+        return sac_reader(filename, header=header)
+    offset = (start - reference).total_seconds()
+    data, b, delta = sac_reader(
+        filename, offset, (end - reference).total_seconds(), header
+    )
+    return (data, b - offset, delta)
 
 
 def main():
     # Create the command-line options
     parser = argparse.ArgumentParser(description="Read SAC file for plotting")
+    parser.add_argument("filename", help="SAC file to read")
     args = parser.parse_args()
-    if len(args) != 1:
-        parser.error("Incorrect number of arguments")
 
-    sac_reader(sys.argv[1:][0])
+    data, b, delta = sac_reader(args.filename)
+    print(f"b = {b} delta = {delta} npts = {len(data)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""Index of the SAC files written by rdseed, by channel and start time."""
+
+import datetime
+import os
+import re
+from typing import NamedTuple, Optional
+
+from helpers.seedinventory import ChannelKey
+
+# rdseed names its SAC files after the start time of the trace and the
+# channel, e.g. "2010.001.00.00.00.0000.IU.ANMO.00.BHZ.M.SAC"; the start
+# time is left out by some versions
+RDSEED_NAME = re.compile(
+    r"^(?:(\d{4})\.(\d{3})\.(\d{2})\.(\d{2})\.(\d{2})\.(\d{4})\.)?"
+    r"([^.]*)\.([^.]*)\.([^.]*)\.([^.]*)\.([A-Z])\.SAC$"
+)
+
+
+class SacName(NamedTuple):
+    """What rdseed put in the name of a SAC file."""
+
+    filename: str
+    key: ChannelKey
+    start: Optional[datetime.datetime]
+    quality: str
+
+
+def parse_sac_name(filename):
+    """
+    Parse the name of a SAC file written by rdseed.
+
+    :param str filename: File name, with or without its directory
+    :return: SacName, or None if the name is not one rdseed writes
+    """
+    match = RDSEED_NAME.match(os.path.basename(filename))
+    if match is None:
+        return None
+    year, day, hour, minute, second, fraction = match.group(1, 2, 3, 4, 5, 6)
+    start = None
+    if year is not None:
+        start = datetime.datetime(
+            int(year), 1, 1, tzinfo=datetime.timezone.utc
+        ) + datetime.timedelta(
+            days=int(day) - 1,
+            hours=int(hour),
+            minutes=int(minute),
+            seconds=int(second),
+            microseconds=int(fraction) * 100,
+        )
+    return SacName(
+        filename, ChannelKey(*match.group(7, 8, 9, 10)), start, match.group(11)
+    )
+
+
+class SacFileIndex:
+    """
+    SAC files written by rdseed, found by their exact channel codes.
+
+    Every name is parsed once, when it is added. The files of a channel are
+    then a dictionary lookup, so selecting the checked channels costs the
+    number of files selected, and a station or channel code is never matched
+    inside another one. Names that are not rdseed's are ignored.
+    """
+
+    def __init__(self, filenames=()):
+        """
+        :param filenames: Names of the files to index
+        """
+        self.names = {}
+        self.channels = {}
+        self.update(filenames)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, filename):
+        return filename in self.names
+
+    def update(self, filenames):
+        """
+        Add the files that are not indexed yet.
+
+        :return: SacName of every file added
+        """
+        added = []
+        for filename in filenames:
+            if filename in self.names:
+                continue
+            name = parse_sac_name(filename)
+            self.names[filename] = name
+            if name is not None:
+                added.append(name)
+                self.channels.setdefault(name.key, []).append(name)
+
+        # Keep the files of the channels that changed sorted by start time
+        for key in {name.key for name in added}:
+            self.channels[key].sort(
+                key=lambda n: (n.start is not None, n.start, n.filename)
+            )
+        return added
+
+    def update_directory(self, directory):
+        """Add the files of a directory that are not indexed yet."""
+        return self.update(os.listdir(directory))
+
+    def files(self, key):
+        """Return the SacNames of a channel, sorted by start time."""
+        return self.channels.get(key, [])
+
+    def select(self, checkbox_info):
+        """
+        Return the files of the checked channels.
+
+        :param list checkbox_info: ChannelKey of every checked channel, as
+            SeedInfoDialog.get_checkbox_info() returns it
+        :rtype: list(str)
+        """
+        return [
+            name.filename
+            for key in dict.fromkeys(checkbox_info)
+            for name in self.files(key)
+        ]
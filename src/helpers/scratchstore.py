@@ -0,0 +1,182 @@
+"""Disk store of rdseed extractions, shared by time windows and sessions."""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+# Default folder of the store; it outlives the program, so extractions are
+# reused by the next session
+DEFAULT_ROOT = os.path.join(tempfile.gettempdir(), "waveform-plotter-scratch")
+
+# Disk space kept for extractions, in bytes
+DEFAULT_QUOTA = 2 * 1024 * 1024 * 1024
+
+# Bytes read from each end of a volume to hash it
+HASH_BLOCK = 1024 * 1024
+
+# Prefix of the folders rdseed is still writing into
+PARTIAL_PREFIX = "partial-"
+
+# Partial folders older than this, in seconds, were left by a crash
+PARTIAL_MAX_AGE = 24 * 60 * 60
+
+
+def volume_hash(filename) -> str:
+    """
+    Return a hash of the contents of a SEED volume.
+
+    Hashing a volume of several gigabytes would take longer than extracting
+    from it, so only its size and the blocks at both of its ends are hashed.
+    Those hold the control headers and the last data records, which change
+    whenever the volume does.
+    """
+    digest = hashlib.sha1()
+    size = os.path.getsize(filename)
+    digest.update(str(size).encode())
+    with open(filename, "rb") as volume:
+        digest.update(volume.read(HASH_BLOCK))
+        if size > HASH_BLOCK:
+            volume.seek(max(size - HASH_BLOCK, HASH_BLOCK))
+            digest.update(volume.read(HASH_BLOCK))
+    return digest.hexdigest()
+
+
+def entry_name(key) -> str:
+    """Return the name of the folder of an entry."""
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def folder_size(directory) -> int:
+    size = 0
+    for entry in os.scandir(directory):
+        if entry.is_file(follow_symlinks=False):
+            size += entry.stat().st_size
+    return size
+
+
+class ScratchStore:
+    """
+    Folders of SAC files written by rdseed, kept on disk within a quota.
+
+    An entry is found by a key such as (volume hash, channels, start, end),
+    so the same window of the same volume is only extracted once, whatever
+    the file is called and however many times the program is run. rdseed
+    writes into a partial folder, which only becomes an entry once rdseed
+    succeeds. When the entries use more than the quota, the least recently
+    used ones are removed; entries in use are pinned so they are kept.
+
+    Every path is absolute, so nothing depends on the working directory.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, quota=DEFAULT_QUOTA):
+        """
+        :param str root: Folder of the store, created if needed
+        :param int quota: Disk space to use for entries, in bytes
+        """
+        self.root = os.path.abspath(root)
+        self.quota = quota
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.pinned = {}
+        os.makedirs(self.root, exist_ok=True)
+        self.scan()
+
+    def __contains__(self, key):
+        return entry_name(key) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def scan(self) -> None:
+        """Find the entries left by earlier sessions, oldest first."""
+        found = []
+        now = time.time()
+        for entry in os.scandir(self.root):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            mtime = entry.stat().st_mtime
+            if entry.name.startswith(PARTIAL_PREFIX):
+                if now - mtime > PARTIAL_MAX_AGE:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+            found.append((mtime, entry.name, folder_size(entry.path)))
+
+        self.entries.clear()
+        for _, name, size in sorted(found):
+            self.entries[name] = size
+        self.nbytes = sum(self.entries.values())
+
+    def get(self, key):
+        """Return the folder of an entry and mark it as used, or None."""
+        name = entry_name(key)
+        if name not in self.entries:
+            return None
+        path = os.path.join(self.root, name)
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed by another instance sharing the store
+            self.nbytes -= self.entries.pop(name)
+            return None
+        self.entries.move_to_end(name)
+        return path
+
+    def create(self) -> str:
+        """Return a new partial folder for rdseed to write into."""
+        return tempfile.mkdtemp(prefix=PARTIAL_PREFIX, dir=self.root)
+
+    def commit(self, directory, key) -> str:
+        """
+        Make a partial folder the entry of a key, and remove the least
+        recently used entries if the store is over its quota.
+
+        :return: Folder of the entry
+        """
+        name = entry_name(key)
+        path = os.path.join(self.root, name)
+        if name in self.entries:
+            # Extracted twice at the same time; the first one is kept
+            self.discard(directory)
+            return path
+        os.replace(directory, path)
+        self.entries[name] = folder_size(path)
+        self.nbytes += self.entries[name]
+        self.evict(keep=name)
+        return path
+
+    def discard(self, directory) -> None:
+        """Remove a partial folder, e.g. when rdseed failed or was stopped."""
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def pin(self, key) -> None:
+        """Keep an entry while its files are read or mapped."""
+        name = entry_name(key)
+        self.pinned[name] = self.pinned.get(name, 0) + 1
+
+    def unpin(self, key) -> None:
+        name = entry_name(key)
+        count = self.pinned.get(name, 0) - 1
+        if count > 0:
+            self.pinned[name] = count
+        else:
+            self.pinned.pop(name, None)
+
+    def evict(self, keep=None) -> None:
+        """Remove the least recently used entries that are not pinned."""
+        for name in list(self.entries):
+            if self.nbytes <= self.quota:
+                break
+            if name == keep or name in self.pinned:
+                continue
+            self.nbytes -= self.entries.pop(name)
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove every entry that is not pinned."""
+        quota = self.quota
+        self.quota = 0
+        self.evict()
+        self.quota = quota
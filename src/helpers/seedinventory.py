@@ -0,0 +1,496 @@
+"""Stations, channels and time coverage of a SEED volume, read in-process."""
+
+import argparse
+import datetime
+import json
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from helpers.intervaltree import IntervalTree
+from helpers.loader import ParallelLoader
+from helpers.miniseed import DATA_QUALITIES, volume_record_length
+from helpers.recordindex import RecordIndex, from_microseconds, to_microseconds
+
+# Suffix of the sidecar file saved next to the volume
+INVENTORY_SUFFIX = ".inv.json"
+
+# Increase when the sidecar layout changes, so old sidecar files are rebuilt
+INVENTORY_VERSION = 2
+
+# Control header types: volume, abbreviation, station and time span
+CONTROL_TYPES = (b"V", b"A", b"S", b"T")
+
+# Widths of the fields of blockettes 50 (station identifier) and 52
+# (channel identifier); None is a variable length field ending with "~"
+STATION_FIELDS = (3, 4, 5, 10, 11, 7, 4, 3, None, 3, 4, 2, None, None, 1, 2)
+CHANNEL_FIELDS = (
+    *(3, 4, 2, 3, 4, 3, None, 3, 3, 10, 11, 7, 5, 5, 5, 4, 2, 10, 10, 4),
+    *(None, None, None, 1),
+)
+
+
+class StationInfo(NamedTuple):
+    """Blockette 50 of a station."""
+
+    network: str
+    station: str
+    latitude: float
+    longitude: float
+    elevation: float
+    site: str
+
+
+class ChannelKey(NamedTuple):
+    """Network, station, location and channel codes of a channel."""
+
+    network: str
+    station: str
+    location: str
+    channel: str
+
+    def __str__(self):
+        return ".".join(self)
+
+
+class ChannelInfo(NamedTuple):
+    """
+    A channel, and the spans of time without gaps it has data for.
+
+    Spans are kept as sorted arrays of microseconds since the epoch, which do
+    not overlap, so a time is looked up with a binary search.
+    """
+
+    key: ChannelKey
+    sample_rate: float
+    samples: int
+    starts: np.ndarray
+    ends: np.ndarray
+
+    @property
+    def network(self) -> str:
+        return self.key.network
+
+    @property
+    def station(self) -> str:
+        return self.key.station
+
+    @property
+    def location(self) -> str:
+        return self.key.location
+
+    @property
+    def channel(self) -> str:
+        return self.key.channel
+
+    @property
+    def spans(self):
+        """Return the spans as (start, end) datetime pairs."""
+        return [
+            (from_microseconds(start), from_microseconds(end))
+            for start, end in zip(self.starts, self.ends)
+        ]
+
+    @property
+    def start(self):
+        return from_microseconds(self.starts[0]) if len(self.starts) else None
+
+    @property
+    def end(self):
+        return from_microseconds(self.ends[-1]) if len(self.ends) else None
+
+    def _overlapping(self, start, end):
+        first = np.searchsorted(self.ends, to_microseconds(start), "right")
+        stop = np.searchsorted(self.starts, to_microseconds(end), "left")
+        return first, max(stop, first)
+
+    def has_data(self, start, end) -> bool:
+        """Return whether the channel has data between two UTC datetimes."""
+        first, stop = self._overlapping(start, end)
+        return stop > first
+
+    def gaps(self, start, end):
+        """
+        Return the spans between two UTC datetimes without data.
+
+        :rtype: list of (start, end) datetime pairs
+        """
+        first, stop = self._overlapping(start, end)
+        edges = np.empty(2 * (stop - first) + 2, dtype=np.int64)
+        edges[0] = to_microseconds(start)
+        edges[1:-1:2] = self.starts[first:stop]
+        edges[2:-1:2] = self.ends[first:stop]
+        edges[-1] = to_microseconds(end)
+        return [
+            (from_microseconds(gap_start), from_microseconds(gap_end))
+            for gap_start, gap_end in zip(edges[0::2], edges[1::2])
+            if gap_end > gap_start
+        ]
+
+
+def seed_time(text):
+    """
+    Return a SEED time, "yyyy,ddd,hh:mm:ss.ffff" with any trailing part
+    left out, as a UTC datetime, or None if it is empty.
+    """
+    parts = text.strip().replace(":", ",").split(",")
+    if not parts[0]:
+        return None
+    values = [float(part) if part else 0.0 for part in parts]
+    values += [1.0, 0.0, 0.0, 0.0][len(values) - 1 :]
+    year, day, hour, minute, second = values[:5]
+    return datetime.datetime(int(year), 1, 1, tzinfo=datetime.timezone.utc) + (
+        datetime.timedelta(days=day - 1, hours=hour, minutes=minute, seconds=second)
+    )
+
+
+def rdseed_time(value) -> str:
+    """Return a datetime in the format rdseed reads and prints."""
+    return (
+        f"{value.year},{value.timetuple().tm_yday:03d},"
+        f"{value:%H:%M:%S}.{value.microsecond // 100:04d}"
+    )
+
+
+def split_fields(text, widths):
+    """Split a blockette into its fixed and variable length fields."""
+    fields = []
+    position = 0
+    for width in widths:
+        if width is None:
+            end = text.find("~", position)
+            end = len(text) if end < 0 else end
+            fields.append(text[position:end])
+            position = end + 1
+        else:
+            fields.append(text[position : position + width])
+            position += width
+    return fields
+
+
+def _float(text) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return 0.0
+
+
+def control_blockettes(buffer):
+    """
+    Yield the (type, text) of every blockette of the control headers at the
+    start of a full SEED volume; there are none in miniSEED.
+
+    A blockette may go on in the next logical record, which is then marked
+    as a continuation; the rest of a record that is not continued is blank.
+    """
+    record_length = volume_record_length(buffer)
+    if record_length is None:
+        return
+    stream = b""
+    offset = 0
+    while offset + 8 <= len(buffer):
+        header = bytes(buffer[offset : offset + 8])
+        if header[6:7] in DATA_QUALITIES or header[6:7] not in CONTROL_TYPES:
+            break
+        payload = bytes(buffer[offset + 8 : offset + record_length])
+        if header[7:8] == b"*":
+            stream += payload
+        else:
+            yield from _split_blockettes(stream)
+            stream = payload
+        offset += record_length
+    yield from _split_blockettes(stream)
+
+
+def _split_blockettes(stream):
+    position = 0
+    while position + 7 <= len(stream):
+        kind = stream[position : position + 3]
+        if not kind.strip().isdigit():
+            break
+        length = int(stream[position + 3 : position + 7])
+        if length < 7:
+            break
+        text = stream[position : position + length].decode("ascii", "replace")
+        yield int(kind), text
+        position += length
+
+
+def read_control_headers(buffer):
+    """
+    Return the stations of the volume, and the sample rate of each channel
+    given by its blockettes 52.
+
+    :return: (list(StationInfo), {(net, sta, loc, cha): sample_rate})
+    """
+    stations = []
+    rates = {}
+    station = None
+    for kind, text in control_blockettes(buffer):
+        if kind == 50:
+            fields = split_fields(text, STATION_FIELDS)
+            station = StationInfo(
+                fields[15].strip(),
+                fields[2].strip(),
+                _float(fields[3]),
+                _float(fields[4]),
+                _float(fields[5]),
+                fields[8].strip(),
+            )
+            stations.append(station)
+        elif kind == 52 and station is not None:
+            fields = split_fields(text, CHANNEL_FIELDS)
+            key = (station.network, station.station, fields[2].strip(), fields[3])
+            rates[key] = _float(fields[17])
+    return stations, rates
+
+
+def coverage(rows, sample_rate):
+    """
+    Return the spans without gaps of the records of one channel, a gap being
+    longer than half a sample.
+
+    :param numpy.ndarray rows: Records of the channel from a RecordIndex,
+        sorted by time
+    :return: (starts, ends) arrays, in microseconds since the epoch
+    """
+    if not len(rows):
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    tolerance = max(int(0.5e6 / sample_rate), 1) if sample_rate else 1
+    starts = rows["start"]
+    ends = np.maximum.accumulate(rows["end"])
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] > tolerance) + 1
+    firsts = np.concatenate(([0], breaks))
+    lasts = np.concatenate((breaks - 1, [len(rows) - 1]))
+    return starts[firsts].astype(np.int64), ends[lasts].astype(np.int64)
+
+
+class Inventory:
+    """
+    What a SEED volume holds: its stations, and its channels keyed by
+    ChannelKey, with the spans of time each has data for.
+
+    The control headers at the start of the volume are parsed for the
+    stations, and the time spans come from the headers of the data records
+    (see helpers.recordindex). The inventory is cached next to the volume, so
+    opening the same volume again only reads a small JSON file.
+
+    The spans of all channels are kept in an interval tree, so the channels
+    with data in a time window are found in O(log n) plus the number found.
+    """
+
+    def __init__(self, filename, stations, channels):
+        """
+        :param str filename: Path to the SEED volume
+        :param list stations: StationInfo of every station
+        :param list channels: ChannelInfo of every channel
+        """
+        self.filename = str(filename)
+        self.stations = {(s.network, s.station): s for s in stations}
+        self.channels = {c.key: c for c in sorted(channels, key=lambda c: c.key)}
+
+        # Every span of every channel, pointing back to its channel
+        self.keys = list(self.channels)
+        channels = list(self.channels.values())
+        self.tree = IntervalTree(
+            np.concatenate([np.empty(0, np.int64)] + [c.starts for c in channels]),
+            np.concatenate([np.empty(0, np.int64)] + [c.ends for c in channels]),
+            np.repeat(np.arange(len(channels)), [len(c.starts) for c in channels]),
+        )
+
+    def __contains__(self, key):
+        return key in self.channels
+
+    def __getitem__(self, key):
+        return self.channels[key]
+
+    @property
+    def start(self):
+        return from_microseconds(self.tree.starts[0]) if len(self.tree) else None
+
+    @property
+    def end(self):
+        return from_microseconds(self.tree.max_ends[1]) if len(self.tree) else None
+
+    def station_channels(self):
+        """
+        Return the channels of every station that have data.
+
+        :return: {(network, station): [ChannelInfo, ...]}, sorted by codes
+        """
+        stations = {}
+        for key, channel in self.channels.items():
+            if len(channel.starts):
+                stations.setdefault(key[:2], []).append(channel)
+        return stations
+
+    def channels_between(self, start, end):
+        """
+        Return the keys of the channels that have data between two UTC
+        datetimes, sorted by codes.
+
+        :rtype: list(ChannelKey)
+        """
+        found = self.tree.overlapping(to_microseconds(start), to_microseconds(end))
+        return [self.keys[i] for i in np.unique(found)]
+
+    def gaps(self, key, start, end):
+        """Return the spans of a channel between two times without data."""
+        return self.channels[key].gaps(start, end)
+
+    @classmethod
+    def build(cls, filename):
+        """Read the inventory of a volume from the volume itself."""
+        buffer = np.memmap(filename, np.uint8, "r")
+        stations, rates = read_control_headers(buffer)
+        index = RecordIndex.open(filename)
+
+        channels = []
+        for key in set(index.channels) | set(rates):
+            first, stop = index.channels.get(key, (0, 0))
+            rows = index.rows[first:stop]
+            rate = rates.get(key) or (float(rows["sample_rate"][0]) if stop else 0.0)
+            channels.append(
+                ChannelInfo(
+                    ChannelKey(*key),
+                    rate,
+                    int(rows["npts"].sum()),
+                    *coverage(rows, rate),
+                )
+            )
+        return cls(filename, stations, channels)
+
+    @classmethod
+    def open(cls, filename, save=True):
+        """
+        Return the inventory of a volume, from its sidecar file if that is
+        still valid, or by reading the volume.
+
+        :param str filename: Path to the SEED volume
+        :param bool save: Write a new sidecar when the volume was read
+        """
+        stat = os.stat(filename)
+        try:
+            with open(str(filename) + INVENTORY_SUFFIX, encoding="utf-8") as sidecar:
+                saved = json.load(sidecar)
+            if saved["stamp"] == [INVENTORY_VERSION, stat.st_mtime_ns, stat.st_size]:
+                return cls.from_dict(filename, saved)
+        except (OSError, KeyError, TypeError, ValueError):
+            pass
+
+        inventory = cls.build(filename)
+        if save:
+            inventory.save(stat)
+        return inventory
+
+    @classmethod
+    def from_dict(cls, filename, saved):
+        stations = [StationInfo(*station) for station in saved["stations"]]
+        channels = [
+            ChannelInfo(
+                ChannelKey(*channel[:4]),
+                *channel[4:6],
+                np.array(channel[6], dtype=np.int64),
+                np.array(channel[7], dtype=np.int64),
+            )
+            for channel in saved["channels"]
+        ]
+        return cls(filename, stations, channels)
+
+    def to_dict(self, stat) -> dict:
+        return {
+            "stamp": [INVENTORY_VERSION, stat.st_mtime_ns, stat.st_size],
+            "stations": [list(station) for station in self.stations.values()],
+            "channels": [
+                [*c.key, c.sample_rate, c.samples, c.starts.tolist(), c.ends.tolist()]
+                for c in self.channels.values()
+            ],
+        }
+
+    def save(self, stat=None) -> None:
+        """Write the sidecar file; volumes in read-only places stay uncached."""
+        stat = os.stat(self.filename) if stat is None else stat
+        try:
+            with open(
+                self.filename + INVENTORY_SUFFIX, "w", encoding="utf-8"
+            ) as output:
+                json.dump(self.to_dict(stat), output)
+        except OSError:
+            pass
+
+
+class InventoryJob(QObject):
+    """
+    Read the inventory of a volume off the GUI thread.
+
+    The job has the signals and methods of helpers.rdseed.RdseedJob, so the
+    main window follows it like any other job.
+    """
+
+    # Create signals
+    progress = pyqtSignal(int, name="progress")
+    finished = pyqtSignal(bool, name="finished")
+
+    def __init__(self, filename, parent=None):
+        # Init the base class
+        QObject.__init__(self, parent)
+
+        # Init class variables
+        self.filename = str(filename)
+        self.inventory = None
+        self.error = ""
+        self.cancelled = False
+        self.running = False
+        self.loader = ParallelLoader(Inventory.open, [self.filename], self, 1)
+        self.loader.loaded.connect(self._loaded)
+        self.loader.failed.connect(self._failed)
+        self.loader.finished.connect(self._finished)
+
+    def start(self) -> None:
+        self.running = True
+        self.loader.start()
+
+    def cancel(self) -> None:
+        """Drop the inventory; finished is emitted with False."""
+        if self.running:
+            self.cancelled = True
+            self.loader.cancel()
+            self._finished()
+
+    def _loaded(self, filename, inventory) -> None:
+        self.inventory = inventory
+
+    def _failed(self, filename, error) -> None:
+        self.error = error
+
+    def _finished(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        self.finished.emit(not self.cancelled and self.inventory is not None)
+
+
+def main():
+    # Create the command-line options
+    parser = argparse.ArgumentParser(
+        description="Print the channels of a SEED file and their time spans"
+    )
+    parser.add_argument("filename", help="SEED or miniSEED file to read")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    inventory = Inventory.open(args.filename)
+    elapsed = time.perf_counter() - started
+    print(f"{len(inventory.channels)} channels in {elapsed * 1000:.1f} ms")
+    for station in inventory.stations.values():
+        print(f"{station.network}.{station.station} {station.site}")
+    for key, channel in inventory.channels.items():
+        for start, end in channel.spans:
+            print(f"{key} {rdseed_time(start)} {rdseed_time(end)}")
+
+
+if __name__ == "__main__":
+    main()
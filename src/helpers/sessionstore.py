@@ -0,0 +1,43 @@
+"""SAC files extracted once per session and read by time window."""
+
+from helpers.sacfilereader import read_sac_header
+from helpers.windowcache import read_trace_window
+
+
+class SessionStore:
+    """
+    Whole traces of the selected channels, read by time window.
+
+    The SEED volume is extracted once, over its full time span, and the
+    header of every SAC file is read once. A time window then only maps the
+    samples of each file that are inside it, so its cost depends on the
+    length of the window and not on the size of the volume. Windows are
+    read with read() in worker threads, which also summarize them.
+    """
+
+    def __init__(self, key, filenames):
+        """
+        :param key: What was extracted, to tell whether a new extraction is
+            needed for other channels or another volume
+        :param list filenames: SAC files with the whole span of each channel
+        """
+        self.key = key
+        self.headers = {filename: read_sac_header(filename) for filename in filenames}
+
+    def __len__(self):
+        return len(self.headers)
+
+    @property
+    def filenames(self):
+        return list(self.headers)
+
+    def read(self, filename, start, end):
+        """
+        Read the part of one trace between two times.
+
+        :param datetime.datetime start: Start of the window, in UTC
+        :param datetime.datetime end: End of the window, in UTC
+        :return: ((data, b, delta), summary), b being seconds since start,
+            or None if the trace has no samples in the window
+        """
+        return read_trace_window(filename, start, end, self.headers[filename])
@@ -0,0 +1,183 @@
+"""Block-level summary statistics of traces."""
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from helpers.detrend import linear_trends
+from helpers.pyramid import MinMaxPyramid
+
+# Number of samples converted to float64 per pass while building the index
+SAMPLES_PER_PASS = 1 << 20
+
+
+class ChunkStats:
+    """
+    Minimum, maximum, sum and sum of squares of every fixed-size block of a
+    trace.
+
+    Statistics over a range of samples are answered at block resolution,
+    without reading the trace: the range is widened to the blocks it
+    touches, sums come from running totals of the blocks and extrema from
+    the coarser levels of block minima and maxima, each of which merges
+    block_size bins of the level below. The blocks are the first level of
+    the trace's MinMaxPyramid.
+    """
+
+    def __init__(self, data, block_size=8):
+        """
+        :param numpy.ndarray data: Samples of the trace
+        :param int block_size: Number of samples per block
+        """
+        self.npts = len(data)
+        self.block_size = block_size
+
+        nblocks = -(-len(data) // block_size)
+        mins = np.empty(nblocks, dtype=np.float32)
+        maxs = np.empty(nblocks, dtype=np.float32)
+        sums = np.empty(nblocks)
+        sumsqs = np.empty(nblocks)
+
+        # Sum of the samples weighted by their distance to the middle of the
+        # trace, the other moment a linear trend needs
+        self.moment = 0.0
+        middle = (len(data) - 1) / 2
+
+        # Convert the trace to float64 a pass at a time, the only time it is
+        # read
+        step = block_size * (SAMPLES_PER_PASS // block_size)
+        for start in range(0, len(data), step):
+            values = np.asarray(data[start : start + step], dtype=np.float64)
+            starts = np.arange(0, len(values), block_size)
+            blocks = slice(start // block_size, start // block_size + len(starts))
+            mins[blocks] = np.minimum.reduceat(values, starts)
+            maxs[blocks] = np.maximum.reduceat(values, starts)
+            sums[blocks] = np.add.reduceat(values, starts)
+            sumsqs[blocks] = np.add.reduceat(values * values, starts)
+            self.moment += values.dot(np.arange(start, start + len(values)) - middle)
+
+        # Running totals make the sums over any run of blocks O(1)
+        self.cum_sums = np.concatenate(([0.0], np.cumsum(sums)))
+        self.cum_sumsqs = np.concatenate(([0.0], np.cumsum(sumsqs)))
+
+        # Each level merges block_size bins of the one below, so the extrema
+        # of a range are found from a few bins per level
+        self.levels = [(mins, maxs)]
+        while len(mins) > block_size:
+            starts = np.arange(0, len(mins), block_size)
+            mins = np.minimum.reduceat(mins, starts)
+            maxs = np.maximum.reduceat(maxs, starts)
+            self.levels.append((mins, maxs))
+
+    def __len__(self):
+        return self.npts
+
+    @property
+    def mins(self):
+        return self.levels[0][0]
+
+    @property
+    def maxs(self):
+        return self.levels[0][1]
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = self.cum_sums.nbytes + self.cum_sumsqs.nbytes
+        for mins, maxs in self.levels:
+            nbytes += mins.nbytes + maxs.nbytes
+        return nbytes
+
+    def extrema(self, block_first, block_stop):
+        """Return the minimum and maximum of a range of blocks."""
+        minimum, maximum = math.inf, -math.inf
+        for level, (mins, maxs) in enumerate(self.levels):
+            # Bins of the next level that are wholly inside the range are
+            # left to it; the rest are read here
+            up_first = -(-block_first // self.block_size)
+            up_stop = block_stop // self.block_size
+            if level + 1 == len(self.levels) or up_first >= up_stop:
+                parts = [slice(block_first, block_stop)]
+            else:
+                parts = [
+                    slice(block_first, up_first * self.block_size),
+                    slice(up_stop * self.block_size, block_stop),
+                ]
+            for part in parts:
+                minimum = min(minimum, np.min(mins[part], initial=math.inf))
+                maximum = max(maximum, np.max(maxs[part], initial=-math.inf))
+            if len(parts) == 1:
+                break
+            block_first, block_stop = up_first, up_stop
+        return (float(minimum), float(maximum))
+
+    def summary(self, first=0, stop=None):
+        """
+        Return the statistics of the blocks holding samples first to stop.
+
+        :return: Tuple of (count, sum, sum of squares, minimum, maximum)
+        """
+        stop = self.npts if stop is None else stop
+        first = min(max(first, 0), self.npts)
+        stop = min(max(stop, first), self.npts)
+        if first == stop:
+            return (0, 0.0, 0.0, math.inf, -math.inf)
+
+        block_first = first // self.block_size
+        block_stop = -(-stop // self.block_size)
+        count = min(block_stop * self.block_size, self.npts) - (
+            block_first * self.block_size
+        )
+        total = self.cum_sums[block_stop] - self.cum_sums[block_first]
+        total_sq = self.cum_sumsqs[block_stop] - self.cum_sumsqs[block_first]
+        minimum, maximum = self.extrema(block_first, block_stop)
+        return (count, float(total), float(total_sq), minimum, maximum)
+
+    def mean(self, first=0, stop=None) -> float:
+        count, total, _, _, _ = self.summary(first, stop)
+        return total / count if count else 0.0
+
+    def rms(self, first=0, stop=None) -> float:
+        count, _, total_sq, _, _ = self.summary(first, stop)
+        return math.sqrt(total_sq / count) if count else 0.0
+
+    def min_max(self, first=0, stop=None):
+        _, _, _, minimum, maximum = self.summary(first, stop)
+        return (minimum, maximum)
+
+    def y_limit(self, first=0, stop=None, offset=0.0) -> float:
+        """
+        Return the y-limit that fits samples first to stop on a symmetric
+        axis, once offset has been subtracted from them.
+        """
+        count, _, _, minimum, maximum = self.summary(first, stop)
+        if not count:
+            return 0.0
+        return max(abs(minimum - offset), abs(maximum - offset))
+
+    def trends(self):
+        """Return the mean and linear trend of the trace, by order."""
+        return linear_trends(self.npts, self.cum_sums[-1], self.moment)
+
+
+class TraceSummary(NamedTuple):
+    """Everything computed from a trace's samples when it is loaded."""
+
+    pyramid: MinMaxPyramid
+    trends: dict
+    stats: ChunkStats
+
+
+def summarize(data) -> TraceSummary:
+    """
+    Build the pyramid, trends and block statistics of a trace.
+
+    The samples are read once, by ChunkStats; the pyramid above its first
+    level and the trends are derived from the block statistics.
+
+    :param numpy.ndarray data: Samples of the trace
+    :rtype: TraceSummary
+    """
+    stats = ChunkStats(data)
+    pyramid = MinMaxPyramid(data, factor=stats.block_size, levels=stats.levels)
+    return TraceSummary(pyramid, stats.trends(), stats)
@@ -0,0 +1,293 @@
+"""Decoded traces of recently viewed time windows."""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from helpers.loader import ParallelLoader
+from helpers.rdseed import RdseedJob
+from helpers.sacfilereader import read_window, sac_reader
+from helpers.tracestats import summarize
+
+# Memory kept for decoded windows, in bytes
+DEFAULT_BUDGET = 512 * 1024 * 1024
+
+
+def read_trace(filename):
+    """
+    Read a SAC file into memory, with everything PlotWidget needs from it.
+
+    Unlike a memory map, the samples stay valid once the file is deleted.
+
+    :return: ((samples, b, delta), summary)
+    """
+    data, b, delta = sac_reader(str(filename))
+    data = np.array(data, dtype=np.float32)
+    return ((data, b, delta), summarize(data))
+
+
+def read_trace_window(filename, start, end, header=None):
+    """
+    Read the part of a SAC file in a time window into memory, with
+    everything PlotWidget needs from it.
+
+    :param datetime.datetime start: Start of the window, in UTC
+    :param datetime.datetime end: End of the window, in UTC
+    :param helpers.sacfilereader.SacHeader header: Header of the file, if
+        it was read already
+    :return: ((samples, b, delta), summary), b being seconds since start,
+        or None if the file has no samples in the window
+    """
+    data, b, delta = read_window(str(filename), start, end, header)
+    if len(data) == 0:
+        return None
+    data = np.array(data, dtype=np.float32)
+    return ((data, b, delta), summarize(data))
+
+
+def read_channel(index, key, start, end):
+    """
+    Decode a channel of a SEED volume between two times, with everything
+    PlotWidget needs from it.
+
+    :param helpers.recordindex.RecordIndex index: Records of the volume
+    :param helpers.seedinventory.ChannelKey key: Channel to decode
+    :param datetime.datetime start: Start of the window, in UTC
+    :param datetime.datetime end: End of the window, in UTC
+    :return: (label, ((samples, b, delta), summary)) of every part of the
+        channel without gaps, b being seconds since the start of the window
+    """
+    segments = index.read(*key, start, end)
+    traces = []
+    for segment in segments:
+        data, b, delta = segment.plot_data(start)
+        data = np.asarray(data, dtype=np.float32)
+        label = str(key)
+        if len(segments) > 1:
+            label += f" {segment.start:%Y-%m-%dT%H:%M:%S}"
+        traces.append((label, ((data, b, delta), summarize(data))))
+    return traces
+
+
+def trace_nbytes(result) -> int:
+    """Return the memory used by a trace returned by read_trace()."""
+    (data, _, _), summary = result
+    # The levels of the pyramid above the samples are those of the stats
+    return data.nbytes + summary.stats.nbytes
+
+
+class WindowCache:
+    """
+    Least recently used cache of decoded windows, bounded by memory.
+
+    A window is the list of (filename, trace) pairs plotted for one time
+    window, where trace is what read_trace() returns. When the windows use
+    more than the budget, the least recently used ones are dropped, but the
+    window added last is always kept.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        """
+        :param int budget: Memory to use for decoded windows, in bytes
+        """
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return a window and mark it as used, or None if it is not cached."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, traces) -> None:
+        """Add a window, dropping the least recently used ones if needed."""
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        nbytes = sum(trace_nbytes(result) for _, result in traces)
+        self.entries[key] = (traces, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.budget and len(self.entries) > 1:
+            _, (_, dropped) = self.entries.popitem(last=False)
+            self.nbytes -= dropped
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.nbytes = 0
+
+
+class WindowFetch(QObject):
+    """
+    Decode a time window off the GUI thread.
+
+    Volumes whose records can all be decoded are read directly, through
+    their RecordIndex, one channel per worker (see decode). Otherwise the
+    window is extracted with rdseed, which writes into a partial folder of
+    a ScratchStore. That folder becomes an entry of the store once rdseed
+    succeeds, so the same window is only decoded again the next time it is
+    needed, in this session or a later one. The SAC files are read into
+    memory by a ParallelLoader, which can also read the window out of files
+    that are already on disk (see read_files).
+    """
+
+    # Create signals
+    ready = pyqtSignal(object, object, name="ready")
+    failed = pyqtSignal(object, str, name="failed")
+
+    def __init__(self, key, select, store, scratch_key, parent=None):
+        """
+        :param key: Key of the window in the WindowCache
+        :param select: Function that returns the names of the files to read
+            out of a list of the files rdseed wrote
+        :param helpers.scratchstore.ScratchStore store: Where rdseed writes
+        :param scratch_key: Key of the extraction in the store
+        """
+        # Init the base class
+        QObject.__init__(self, parent)
+
+        # Init class variables
+        self.key = key
+        self.select = select
+        self.store = store
+        self.scratch_key = scratch_key
+        self.directory = None
+        self.job = None
+        self.loader = None
+        self.pinned = False
+        self.results = {}
+        self.filenames = []
+        self.errors = []
+        self.cancelled = False
+
+    def extract(self, answers) -> RdseedJob:
+        """
+        Return the rdseed job that extracts the window, which the caller
+        starts, as it may want to follow it.
+
+        :param str answers: Answers to rdseed's prompts, see
+            helpers.rdseed.extraction_answers()
+        """
+        self.directory = self.store.create()
+        self.job = RdseedJob(answers=answers, directory=self.directory, parent=self)
+        self.job.finished.connect(self._extracted)
+        return self.job
+
+    def decode(self, index, keys, start, end) -> None:
+        """
+        Decode the channels of the window from the volume, without rdseed.
+
+        :param helpers.recordindex.RecordIndex index: Records of the volume
+        :param list keys: ChannelKey of every channel to decode
+        :param datetime.datetime start: Start of the window, in UTC
+        :param datetime.datetime end: End of the window, in UTC
+        """
+        channels = {str(key): key for key in keys}
+        self.filenames = list(channels)
+        self.loader = ParallelLoader(
+            lambda name: read_channel(index, channels[name], start, end),
+            self.filenames,
+            self,
+        )
+        self.loader.loaded.connect(self._trace_loaded)
+        self.loader.failed.connect(self._trace_failed)
+        self.loader.finished.connect(self._decoded)
+        self.loader.start()
+
+    def load(self, directory) -> None:
+        """Decode the SAC files of an entry of the store."""
+        self.store.pin(self.scratch_key)
+        self.pinned = True
+        self.read_files(
+            [
+                os.path.join(directory, f)
+                for f in self.select(sorted(os.listdir(directory)))
+            ],
+            read_trace,
+        )
+
+    def read_files(self, filenames, read) -> None:
+        """
+        Decode files that are already on disk.
+
+        :param list filenames: Files to decode
+        :param read: Function that returns the trace of a file, like
+            read_trace(), or None when the file has no samples to plot
+        """
+        self.filenames = list(filenames)
+        self.loader = ParallelLoader(read, self.filenames, self)
+        self.loader.loaded.connect(self._trace_loaded)
+        self.loader.finished.connect(self._loaded)
+        self.loader.start()
+
+    def cancel(self) -> None:
+        """
+        Stop extracting or decoding; neither ready nor failed is emitted.
+
+        The fetch deletes itself once rdseed has exited.
+        """
+        self.cancelled = True
+        if self.job is not None and self.job.running:
+            self.job.cancel()
+            return
+        if self.loader is not None:
+            self.loader.cancel()
+        self.unpin()
+        self.deleteLater()
+
+    def unpin(self) -> None:
+        if self.pinned:
+            self.pinned = False
+            self.store.unpin(self.scratch_key)
+
+    def _extracted(self, ok) -> None:
+        if self.cancelled or not ok:
+            self.store.discard(self.directory)
+        if self.cancelled:
+            self.deleteLater()
+            return
+        if not ok:
+            self.failed.emit(self.key, self.job.error or "rdseed failed")
+            return
+        self.load(self.store.commit(self.directory, self.scratch_key))
+
+    def _trace_loaded(self, filename, result) -> None:
+        self.results[filename] = result
+
+    def _loaded(self) -> None:
+        self.unpin()
+        if self.cancelled:
+            return
+        traces = [
+            (f, self.results[f])
+            for f in self.filenames
+            if self.results.get(f) is not None
+        ]
+        self.ready.emit(self.key, traces)
+
+    def _trace_failed(self, filename, error) -> None:
+        self.errors.append(f"{filename}: {error}")
+
+    def _decoded(self) -> None:
+        if self.cancelled:
+            return
+        traces = [
+            trace for name in self.filenames for trace in self.results.get(name, ())
+        ]
+        if self.errors and not traces:
+            self.failed.emit(self.key, "\n".join(self.errors))
+            return
+        self.ready.emit(self.key, traces)
@@ -0,0 +1,8 @@
+"""Make the modules importable the way main.py imports them."""
+
+import os
+import sys
+
+# The application is run from the src directory, and its modules import
+# each other from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,44 @@
+"""Tests of IntervalTree queries against a linear scan."""
+
+import unittest
+
+import numpy as np
+
+from helpers.intervaltree import IntervalTree
+
+
+class IntervalTreeTest(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        rng = np.random.default_rng(1)
+        for count in (1, 2, 3, 7, 64, 100):
+            starts = rng.integers(0, 1000, count)
+            ends = starts + rng.integers(1, 300, count)
+            tree = IntervalTree(starts, ends)
+            for _ in range(50):
+                start = int(rng.integers(-100, 1200))
+                end = start + int(rng.integers(1, 400))
+                expected = [
+                    i
+                    for i in np.argsort(starts, kind="stable")
+                    if starts[i] < end and ends[i] > start
+                ]
+                self.assertEqual(tree.overlapping(start, end).tolist(), expected)
+
+    def test_half_open(self):
+        tree = IntervalTree([0, 10], [10, 20])
+        self.assertEqual(tree.overlapping(10, 11).tolist(), [1])
+        self.assertEqual(tree.overlapping(-5, 0).tolist(), [])
+        self.assertEqual(tree.overlapping(9, 10).tolist(), [0])
+
+    def test_values(self):
+        tree = IntervalTree([20, 0, 10], [30, 40, 15], ["c", "a", "b"])
+        self.assertEqual(tree.overlapping(12, 25).tolist(), ["a", "b", "c"])
+
+    def test_empty(self):
+        tree = IntervalTree([], [])
+        self.assertEqual(len(tree), 0)
+        self.assertEqual(len(tree.overlapping(0, 100)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+"""Tests of decoding Steim-compressed miniSEED records."""
+
+import datetime
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from helpers.miniseed import FIXED_HEADER, STEIM1, decode_steim, read_miniseed
+
+UTC = datetime.timezone.utc
+
+
+def pack(values, bits):
+    """Pack differences into the low bits of a word, first one highest."""
+    word = 0
+    for value in values:
+        word = (word << bits) | (value & ((1 << bits) - 1))
+    return word
+
+
+def steim_frames(x0, xn, words, nframes=1, byteorder=">"):
+    """
+    Build the Steim frames of a record.
+
+    :param list words: (nibble, word) of every data word, in order
+    :return: uint8 array of 64 * nframes bytes
+    """
+    slots = [(0, x0 & 0xFFFFFFFF), (0, xn & 0xFFFFFFFF), *words]
+    frames = b""
+    for frame in range(nframes):
+        control = 0
+        values = []
+        for position, (nibble, word) in enumerate(slots[15 * frame : 15 * frame + 15]):
+            control |= nibble << (28 - 2 * position)
+            values.append(word)
+        values += [0] * (15 - len(values))
+        frames += struct.pack(byteorder + "16I", control, *values)
+    return np.frombuffer(frames, dtype=np.uint8)
+
+
+# Steim-1 words of 8, 16 and 32 bits; the first difference is replaced by
+# the integration constant
+STEIM1_WORDS = [
+    (1, pack([0, 1, -2, 5], 8)),
+    (2, pack([300, -1000], 16)),
+    (3, pack([100000], 32)),
+]
+STEIM1_SAMPLES = [100, 101, 99, 104, 404, -596, 99404]
+
+# Every Steim-2 word layout, from seven 4-bit differences to one of 30 bits
+STEIM2_WORDS = [
+    (3, 2 << 30 | pack([0, 1, -1, 2, -2, 7, -8], 4)),
+    (2, 1 << 30 | pack([1 << 28], 30)),
+    (2, 3 << 30 | pack([511, -512, 0], 10)),
+    (3, 0 << 30 | pack([31, -32, 1, 2, 3], 6)),
+    (3, 1 << 30 | pack([15, -16, 0, 0, 1, -1], 5)),
+    (1, pack([127, -128, 0, 0], 8)),
+    (2, 2 << 30 | pack([16383, -16384], 15)),
+]
+STEIM2_SAMPLES = [-5, -4, -5, -3, -5, 2, -6] + [
+    (1 << 28) + offset
+    for offset in (-6, 505, -7, -7, 24, -8, -7, -5, -2, 13, -3, -3, -3, -2, -3)
+    + (124, -4, -4, -4, 16379, -5)
+]
+
+
+def data_record(sequence, start, npts, frames, encoding=STEIM1):
+    """Return a 512-byte miniSEED record of IU.ANMO.00.BHZ at 20 Hz."""
+    header = struct.pack(
+        ">6s" + FIXED_HEADER,
+        b"%06d" % sequence,
+        b"D",
+        b"ANMO ",
+        b"00",
+        b"BHZ",
+        b"IU",
+        start.year,
+        start.timetuple().tm_yday,
+        start.hour,
+        start.minute,
+        start.second,
+        start.microsecond // 100,
+        npts,
+        20,
+        1,
+        0,
+        0,
+        0,
+        1,
+        0,
+        64,
+        48,
+    )
+    blockette = struct.pack(">HHBBBx", 1000, 0, encoding, 1, 9)
+    record = header + blockette
+    record += bytes(64 - len(record)) + frames.tobytes()
+    return record + bytes(512 - len(record))
+
+
+class DecodeSteimTest(unittest.TestCase):
+    def test_steim1(self):
+        frames = steim_frames(100, 99404, STEIM1_WORDS)
+        samples = decode_steim(frames[None, :], [7], version=1)
+        self.assertEqual(samples.tolist(), STEIM1_SAMPLES)
+
+    def test_steim2(self):
+        frames = steim_frames(-5, STEIM2_SAMPLES[-1], STEIM2_WORDS)
+        samples = decode_steim(frames[None, :], [len(STEIM2_SAMPLES)], version=2)
+        self.assertEqual(samples.tolist(), STEIM2_SAMPLES)
+
+    def test_little_endian_words(self):
+        frames = steim_frames(100, 99404, STEIM1_WORDS, byteorder="<")
+        samples = decode_steim(frames[None, :], [7], version=1, byteorder="<")
+        self.assertEqual(samples.tolist(), STEIM1_SAMPLES)
+
+    def test_several_records(self):
+        # Each record restarts from its own integration constant, and the
+        # differences past npts are ignored
+        frames = np.stack(
+            [
+                steim_frames(100, 99404, STEIM1_WORDS, nframes=2),
+                steim_frames(7, 10, [(1, pack([5, 1, 2, 3], 8))] * 20, nframes=2),
+            ]
+        )
+        samples = decode_steim(frames, [7, 3], version=1)
+        self.assertEqual(samples.tolist(), STEIM1_SAMPLES + [7, 8, 10])
+
+    def test_too_few_differences(self):
+        frames = steim_frames(100, 99404, STEIM1_WORDS)
+        with self.assertRaises(ValueError):
+            decode_steim(frames[None, :], [8], version=1)
+
+
+class ReadMiniseedTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "anmo.mseed")
+        self.start = datetime.datetime(2020, 1, 5, 1, 2, 3, 500000, tzinfo=UTC)
+
+        # Two contiguous records: the second continues from the last sample
+        # of the first
+        second = self.start + datetime.timedelta(seconds=7 / 20)
+        with open(self.filename, "wb") as output:
+            output.write(
+                data_record(1, self.start, 7, steim_frames(100, 99404, STEIM1_WORDS, 7))
+            )
+            output.write(
+                data_record(
+                    2,
+                    second,
+                    4,
+                    steim_frames(99405, 99414, [(1, pack([1, 2, 3, 4], 8))], 7),
+                )
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_read(self):
+        segments = read_miniseed(self.filename)
+        self.assertEqual(len(segments), 1)
+        segment = segments[0]
+        self.assertEqual(
+            (segment.network, segment.station, segment.location, segment.channel),
+            ("IU", "ANMO", "00", "BHZ"),
+        )
+        self.assertEqual(segment.start, self.start)
+        self.assertEqual(segment.sample_rate, 20.0)
+        self.assertEqual(
+            segment.data.tolist(), STEIM1_SAMPLES + [99405, 99407, 99410, 99414]
+        )
+
+    def test_read_window(self):
+        start = self.start + datetime.timedelta(seconds=0.2)
+        end = self.start + datetime.timedelta(seconds=0.4)
+        segments = read_miniseed(self.filename, start=start, end=end)
+        self.assertEqual(segments[0].start, start)
+        self.assertEqual(segments[0].data.tolist(), [404, -596, 99404, 99405, 99407])
+
+
+if __name__ == "__main__":
+    unittest.main()
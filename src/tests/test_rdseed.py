@@ -0,0 +1,110 @@
+"""Tests of RdseedJob against a stub rdseed."""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from helpers import rdseed
+from helpers.rdseed import RdseedJob
+
+# Stands in for rdseed. The first argument picks what it does: "ok" saves
+# its stdin and writes two SAC files, "hang" waits to be killed and "fail"
+# complains on stderr
+STUB = """\
+import sys
+import time
+
+mode = sys.argv[1]
+if mode == "ok":
+    with open("answers.txt", "w") as answers:
+        answers.write(sys.stdin.read())
+    for name in ("XX.ST01..BHZ.M.SAC", "XX.ST02..BHZ.M.SAC"):
+        open(name, "wb").close()
+        print(f"Writing {name}, 100 samples (binary), starting 2010,001", flush=True)
+    sys.stdout.write("Done")
+elif mode == "hang":
+    print("Waiting", flush=True)
+    time.sleep(60)
+else:
+    sys.stderr.write("Error: bad volume\\n")
+    sys.exit(1)
+"""
+
+# Time to wait for the stub to exit, in milliseconds
+TIMEOUT = 10000
+
+
+class RdseedJobTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        stub = os.path.join(self.directory, "rdseed")
+        with open(stub, "w", encoding="utf-8") as script:
+            script.write(f"#!{sys.executable}\n" + textwrap.dedent(STUB))
+        os.chmod(stub, os.stat(stub).st_mode | stat.S_IXUSR)
+        self.rdseed = rdseed.RDSEED
+        rdseed.RDSEED = stub
+
+    def tearDown(self):
+        rdseed.RDSEED = self.rdseed
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_job(self, job, started=None):
+        """Start a job and return the results it finished with."""
+        results = []
+        loop = QEventLoop()
+        job.finished.connect(results.append)
+        job.finished.connect(loop.quit)
+        QTimer.singleShot(TIMEOUT, loop.quit)
+        job.start()
+        if started is not None:
+            self.assertTrue(job.process.waitForStarted(TIMEOUT))
+            started(job)
+        loop.exec()
+        return results
+
+    def test_finished_ok(self):
+        job = RdseedJob(["ok"], "volume.seed\nQuit\n", self.directory)
+        progress = []
+        job.progress.connect(progress.append)
+        self.assertEqual(self.run_job(job), [True])
+        self.assertEqual(job.written, ["XX.ST01..BHZ.M.SAC", "XX.ST02..BHZ.M.SAC"])
+        self.assertEqual(progress, [1, 2])
+        self.assertEqual(job.lines[-1], "Done")
+        self.assertFalse(job.cancelled)
+        self.assertFalse(job.running)
+        for name in job.written:
+            self.assertTrue(os.path.exists(os.path.join(self.directory, name)))
+        with open(os.path.join(self.directory, "answers.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "volume.seed\nQuit\n")
+
+    def test_cancelled(self):
+        job = RdseedJob(["hang"], directory=self.directory)
+        self.assertEqual(self.run_job(job, RdseedJob.cancel), [False])
+        self.assertTrue(job.cancelled)
+        self.assertFalse(job.running)
+
+    def test_error(self):
+        job = RdseedJob(["fail"], directory=self.directory)
+        self.assertEqual(self.run_job(job), [False])
+        self.assertFalse(job.cancelled)
+        self.assertEqual(job.error.strip(), "Error: bad volume")
+
+    def test_failed_to_start(self):
+        rdseed.RDSEED = os.path.join(self.directory, "missing")
+        job = RdseedJob(directory=self.directory)
+        self.assertEqual(self.run_job(job), [False])
+        self.assertTrue(job.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests of finding the records of a channel in a RecordIndex."""
+
+import datetime
+import unittest
+
+import numpy as np
+
+from helpers.recordindex import RECORD_DTYPE, RecordIndex, from_microseconds
+
+
+def seconds(value):
+    return from_microseconds(value * 1000000)
+
+
+def index_of(records):
+    """Return a RecordIndex of XX.AAA..BHZ records given as (quality, start, end)."""
+    rows = np.zeros(len(records), dtype=RECORD_DTYPE)
+    for i, (quality, start, end) in enumerate(records):
+        rows[i] = (
+            "XX",
+            "AAA",
+            "",
+            "BHZ",
+            quality,
+            start * 1000000,
+            end * 1000000,
+            end - start,
+            1.0,
+            3,
+            ">",
+            512,
+            64,
+            512 * i,
+        )
+    return RecordIndex("volume.seed", rows)
+
+
+def found(index, start=None, end=None, quality=None):
+    rows = index.find("XX", "AAA", "", "BHZ", start, end, quality)
+    return [(str(row["quality"]), int(row["start"]) // 1000000) for row in rows]
+
+
+class FindTest(unittest.TestCase):
+    def test_window(self):
+        index = index_of([("D", 0, 10), ("D", 10, 20), ("D", 20, 30)])
+        self.assertEqual(found(index, seconds(12), seconds(18)), [("D", 10)])
+        # Records are half-open, but a window includes its end
+        self.assertEqual(found(index, seconds(10), seconds(20)), [("D", 10), ("D", 20)])
+        self.assertEqual(found(index, seconds(30), seconds(40)), [])
+        self.assertEqual(found(index, end=seconds(5)), [("D", 0)])
+
+    def test_overlapping(self):
+        # A long record overlaps the short ones after it, so the ends of the
+        # records are not sorted
+        index = index_of([("D", 0, 100), ("D", 10, 20), ("D", 30, 40), ("D", 100, 200)])
+        self.assertEqual(found(index, seconds(50), seconds(60)), [("D", 0)])
+        self.assertEqual(
+            found(index, seconds(35), seconds(150)), [("D", 0), ("D", 30), ("D", 100)]
+        )
+
+    def test_duplicates(self):
+        index = index_of([("D", 0, 10), ("D", 0, 10), ("D", 10, 20)])
+        self.assertEqual(found(index), [("D", 0), ("D", 10)])
+
+    def test_quality(self):
+        # The best quality is read unless another one is asked for
+        index = index_of([("D", 0, 10), ("Q", 0, 10), ("D", 10, 20), ("Q", 10, 20)])
+        self.assertEqual(found(index), [("Q", 0), ("Q", 10)])
+        self.assertEqual(found(index, quality="D"), [("D", 0), ("D", 10)])
+        self.assertEqual(found(index, quality="R"), [])
+
+    def test_unknown_channel(self):
+        index = index_of([("D", 0, 10)])
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        self.assertEqual(len(index.find("XX", "BBB", "", "BHZ", start)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
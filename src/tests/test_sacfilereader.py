@@ -0,0 +1,87 @@
+"""Tests of reading SAC files, whole or by time window."""
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from helpers.sacfilereader import (
+    HEADER_SIZE,
+    UNDEFINED,
+    header_dtype,
+    read_window,
+    sac_reader,
+)
+
+UTC = datetime.timezone.utc
+
+
+def write_sac(filename, data, b, delta, byteorder="<"):
+    """Write an evenly spaced SAC file with its reference time 2020-005."""
+    header = np.zeros(1, header_dtype(byteorder))
+    for name in header.dtype.names:
+        if header.dtype[name].kind == "S":
+            header[name] = str(UNDEFINED).encode()
+        else:
+            header[name] = UNDEFINED
+    header["delta"], header["b"] = delta, b
+    header["e"] = b + (len(data) - 1) * delta
+    header["nzyear"], header["nzjday"] = 2020, 5
+    header["nzhour"] = header["nzmin"] = header["nzsec"] = header["nzmsec"] = 0
+    header["nvhdr"], header["npts"] = 6, len(data)
+    header["iftype"], header["leven"] = 1, 1
+    with open(filename, "wb") as output:
+        output.write(header.tobytes())
+        output.write(np.asarray(data, byteorder + "f4").tobytes())
+    assert os.path.getsize(filename) == HEADER_SIZE + 4 * len(data)
+
+
+class SacReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "trace.sac")
+        self.data = np.arange(1000, dtype=np.float32)
+        write_sac(self.filename, self.data, 10.0, 0.5, ">")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_whole_file(self):
+        data, b, delta = sac_reader(self.filename)
+        np.testing.assert_array_equal(data, self.data)
+        self.assertEqual((b, delta), (10.0, 0.5))
+
+    def test_slice(self):
+        # Samples at 10.0 + 0.5 * i; 20.2 to 25.0 holds samples 21 to 30
+        data, b, delta = sac_reader(self.filename, 20.2, 25.0)
+        np.testing.assert_array_equal(data, self.data[21:31])
+        self.assertAlmostEqual(b, 20.5)
+        self.assertEqual(delta, 0.5)
+
+    def test_slice_outside(self):
+        data, b, _ = sac_reader(self.filename, 1000.0, 2000.0)
+        self.assertEqual(len(data), 0)
+        data, _, _ = sac_reader(self.filename, -50.0, 10.0)
+        np.testing.assert_array_equal(data, self.data[:1])
+
+    def test_read_window(self):
+        # b is returned relative to the start of the window
+        reference = datetime.datetime(2020, 1, 5, tzinfo=UTC)
+        start = reference + datetime.timedelta(seconds=20)
+        end = reference + datetime.timedelta(seconds=30)
+        data, b, delta = read_window(self.filename, start, end)
+        np.testing.assert_array_equal(data, self.data[20:41])
+        self.assertAlmostEqual(b, 0.0)
+        self.assertEqual(delta, 0.5)
+
+        start = reference + datetime.timedelta(seconds=5)
+        data, b, _ = read_window(self.filename, start, end)
+        np.testing.assert_array_equal(data, self.data[:41])
+        self.assertAlmostEqual(b, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Tests of parsing and selecting the SAC files rdseed writes."""
+
+import datetime
+import unittest
+
+from helpers.sacnames import SacFileIndex, parse_sac_name
+from helpers.seedinventory import ChannelKey
+
+
+class ParseSacNameTest(unittest.TestCase):
+    def test_with_start(self):
+        name = parse_sac_name("/tmp/out/2010.032.01.02.03.0450.IU.ANMO.00.BHZ.M.SAC")
+        self.assertEqual(name.key, ChannelKey("IU", "ANMO", "00", "BHZ"))
+        self.assertEqual(
+            name.start,
+            datetime.datetime(2010, 2, 1, 1, 2, 3, 45000, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(name.quality, "M")
+        self.assertEqual(
+            name.filename, "/tmp/out/2010.032.01.02.03.0450.IU.ANMO.00.BHZ.M.SAC"
+        )
+
+    def test_without_start(self):
+        name = parse_sac_name("XX.ST01..BHZ.D.SAC")
+        self.assertEqual(name.key, ChannelKey("XX", "ST01", "", "BHZ"))
+        self.assertIsNone(name.start)
+
+    def test_other_names(self):
+        for filename in (
+            "trace.sac",
+            "XX.ST01..BHZ.SAC",
+            "answers.txt",
+            "rdseed.err_log",
+        ):
+            self.assertIsNone(parse_sac_name(filename))
+
+
+class SacFileIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SacFileIndex(
+            [
+                "2010.001.01.00.00.0000.XX.ANMO..BHZ.M.SAC",
+                "2010.001.00.00.00.0000.XX.ANMO..BHZ.M.SAC",
+                "2010.001.00.00.00.0000.XX.ANMO2..BHZ.M.SAC",
+                "2010.001.00.00.00.0000.XX.ANMO..BHN.M.SAC",
+                "notes.txt",
+            ]
+        )
+
+    def test_select(self):
+        # Files come sorted by start time, and a station code is not matched
+        # inside a longer one
+        self.assertEqual(
+            self.index.select([ChannelKey("XX", "ANMO", "", "BHZ")]),
+            [
+                "2010.001.00.00.00.0000.XX.ANMO..BHZ.M.SAC",
+                "2010.001.01.00.00.0000.XX.ANMO..BHZ.M.SAC",
+            ],
+        )
+
+    def test_select_in_checked_order(self):
+        checked = [
+            ChannelKey("XX", "ANMO2", "", "BHZ"),
+            ChannelKey("XX", "ANMO", "", "BHN"),
+            ChannelKey("XX", "ANMO2", "", "BHZ"),
+            ChannelKey("XX", "NONE", "", "BHZ"),
+        ]
+        self.assertEqual(
+            self.index.select(checked),
+            [
+                "2010.001.00.00.00.0000.XX.ANMO2..BHZ.M.SAC",
+                "2010.001.00.00.00.0000.XX.ANMO..BHN.M.SAC",
+            ],
+        )
+
+    def test_update(self):
+        self.assertEqual(len(self.index), 5)
+        added = self.index.update(
+            ["notes.txt", "2010.001.02.00.00.0000.XX.ANMO..BHZ.M.SAC"]
+        )
+        self.assertEqual([name.key.station for name in added], ["ANMO"])
+        self.assertIn("notes.txt", self.index)
+        self.assertEqual(len(self.index.files(ChannelKey("XX", "ANMO", "", "BHZ"))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
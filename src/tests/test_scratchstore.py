@@ -0,0 +1,79 @@
+"""Tests of the quota, eviction order and pinning of ScratchStore."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from helpers.scratchstore import ScratchStore
+
+
+class ScratchStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = ScratchStore(self.root, quota=250)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def add(self, key, size=100):
+        # Write a partial folder holding one file, and commit it
+        directory = self.store.create()
+        with open(os.path.join(directory, "trace.SAC"), "wb") as output:
+            output.write(bytes(size))
+        return self.store.commit(directory, key)
+
+    def test_commit(self):
+        path = self.add("a")
+        self.assertIn("a", self.store)
+        self.assertEqual(self.store.get("a"), path)
+        self.assertEqual(self.store.nbytes, 100)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(path)])
+
+    def test_evicts_least_recently_used(self):
+        self.add("a")
+        self.add("b")
+        self.store.get("a")
+        self.add("c")
+        self.assertNotIn("b", self.store)
+        self.assertIn("a", self.store)
+        self.assertIn("c", self.store)
+        self.assertEqual(self.store.nbytes, 200)
+        self.assertEqual(len(os.listdir(self.root)), 2)
+
+    def test_keeps_newest_entry(self):
+        # An entry larger than the quota is still kept until the next one
+        self.add("a", 400)
+        self.assertIn("a", self.store)
+        self.add("b")
+        self.assertNotIn("a", self.store)
+
+    def test_pinned(self):
+        self.add("a")
+        self.store.pin("a")
+        self.store.pin("a")
+        self.add("b")
+        self.add("c")
+        self.assertIn("a", self.store)
+        self.assertNotIn("b", self.store)
+
+        # Entries stay pinned until every pin is released
+        self.store.unpin("a")
+        self.store.clear()
+        self.assertIn("a", self.store)
+        self.store.unpin("a")
+        self.store.clear()
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_scan(self):
+        self.add("a")
+        partial = self.store.create()
+        store = ScratchStore(self.root, quota=250)
+        self.assertIn("a", store)
+        self.assertEqual(store.nbytes, 100)
+        self.assertTrue(os.path.isdir(partial))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,34 +1,120 @@
 """Central widget for the Waveform Plotter."""
 
+import math
+
 import qwt
-from PyQt6.QtCore import QSize, pyqtSignal, pyqtSlot
-from PyQt6.QtWidgets import QFileDialog, QGridLayout, QWidget
+from PyQt6.QtCore import QSize, Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QFileDialog, QGridLayout, QProgressDialog, QWidget
 
+from helpers.loader import ParallelLoader
 from helpers.sacfilereader import sac_reader
+from helpers.tracestats import summarize
 from widgets.plotwidget import PlotWidget
+from widgets.renderscheduler import RenderScheduler
+from widgets.stackedplot import StackedPlot
+from widgets.tracedata import TraceData
+from widgets.tracelist import TraceList
+
+
+def read_plot_data(filename):
+    """Read a SAC file and everything PlotWidget needs from it."""
+    data = sac_reader(str(filename))
+    return (data, summarize(data[0]))
 
 
 class CentralWidget(QWidget):
     # Create signals
     y_updated = pyqtSignal(int, name="YUpdated")
     position_change = pyqtSignal(int, name="position_change")
+    rendered = pyqtSignal(int, int, name="rendered")
+    load_failed = pyqtSignal(str, str, name="load_failed")
 
     def __init__(self, widget_parent=None):
         # Init the base class
         QWidget.__init__(self, widget_parent)
 
         # Define class variables
-        self.plot = []
         self.x_max = 0
         self.x_min = 0
         self.y_max = 0
         self.y_min = 0
+        self.loader = None
+        self.progress = None
+        self.scheduler = RenderScheduler(self)
+        self.scheduler.flushed.connect(self.rendered)
+        self.zoom_rect = None
+        self.stacked = False
+        self.background = False
+        self.mean_removed = False
+        self.trend_removed = False
+
+        # Traces are shown in a scrolling list that only has plot widgets
+        # for the rows on screen
+        self.trace_list = TraceList(self.create_plot, self.bind_plot, self)
+
+        # Alternatively, all traces are stacked in a single plot
+        self.stacked_plot = StackedPlot(self)
+        self.stacked_plot.scheduler = self.scheduler
+        self.stacked_plot.hide()
 
         # Set the minimum size and layout
         self.setMinimumSize(750, 250)
         self.grid = QGridLayout()
+        self.grid.addWidget(self.trace_list, 0, 0, 1, 4)
+        self.grid.addWidget(self.stacked_plot, 0, 0, 1, 4)
         self.setLayout(self.grid)
 
+    @property
+    def plot(self):
+        """Return the plot widgets that are on screen."""
+        return self.trace_list.visible_plots()
+
+    @property
+    def traces(self):
+        """Return every trace, on screen or not."""
+        return self.trace_list.traces
+
+    def create_plot(self, widget_parent):
+        # Create a plot widget for the trace list's pool
+        newplot = PlotWidget(None, widget_parent)
+        newplot.scheduler = self.scheduler
+        newplot.set_background(self.background)
+        newplot.get_zoomer().zoomed.connect(self.sync_zoom)
+        return newplot
+
+    def bind_plot(self, p):
+        # Give a plot that was just handed a trace the current axes
+        checked = self.parentWidget().sync_is_checked()
+        self.sync_plot(p, checked)
+        if checked and self.zoom_rect is not None:
+            p.show_rect(self.zoom_rect)
+
+    def set_stacked(self, stacked):
+        """
+        Switch between one plot per trace and all traces in a single plot.
+
+        :param bool stacked: True to stack the traces in a single plot
+        """
+        self.stacked = stacked
+        if stacked:
+            self.stacked_plot.set_traces(self.traces)
+        else:
+            self.scheduler.discard(self.stacked_plot)
+            self.stacked_plot.set_traces([])
+            for p in self.plot:
+                p.update_curve()
+                p.request_replot()
+        self.trace_list.setVisible(not stacked)
+        self.stacked_plot.setVisible(stacked)
+
+    def set_background_rendering(self, background):
+        # Rasterize the curves in worker threads, in both the stacked plot
+        # and the plots of the trace list
+        self.background = background
+        self.stacked_plot.set_background(background)
+        for p in self.trace_list.pool:
+            p.set_background(background)
+
     def get_file_info(self, filenames):
         data = sac_reader(filenames)
         return data
@@ -36,14 +122,92 @@ class CentralWidget(QWidget):
     def new_plot(self, fileName):
         # Read data from the SAC file and update the plot widget
         data = self.get_file_info(str(fileName))
-        newplot = PlotWidget(data, self)
+        self.insert_plot(fileName, data)
+
+    def new_plots(self, fileNames):
+        """
+        Read several SAC files in worker threads and add a plot for each.
+
+        Plots are added as their files finish loading, while a progress
+        dialog lets the user cancel the files that are still pending.
+
+        :param list fileNames: SAC files to plot
+        """
+        self.cancel_loading()
+
+        self.progress = QProgressDialog(
+            "Loading SAC files...", "Cancel", 0, len(fileNames), self
+        )
+        self.progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress.setMinimumDuration(500)
+
+        self.loader = ParallelLoader(read_plot_data, fileNames, self)
+        self.loader.loaded.connect(self.plot_loaded)
+        self.loader.failed.connect(self.plot_failed)
+        self.loader.progress.connect(self.loading_progress)
+        self.loader.finished.connect(self.loader_finished)
+        self.progress.canceled.connect(self.cancel_loading)
+        self.loader.start()
+
+    def is_current_loader(self) -> bool:
+        # Results of a cancelled batch can still be queued when a new batch
+        # starts, so only the signals of the current loader are used
+        return (
+            self.loader is not None
+            and not self.loader.cancelled
+            and self.sender() is self.loader
+        )
+
+    @pyqtSlot(str, object)
+    def plot_loaded(self, fileName, result):
+        if not self.is_current_loader():
+            return
+        data, summary = result
+        self.insert_plot(fileName, data, summary)
+
+    @pyqtSlot(str, str)
+    def plot_failed(self, fileName, error):
+        if self.is_current_loader():
+            self.load_failed.emit(fileName, error)
 
-        # Set plot text displaying the sac file
-        newplot.plot_label(fileName)
+    @pyqtSlot(int, int)
+    def loading_progress(self, done, total):
+        if self.is_current_loader() and self.progress is not None:
+            self.progress.setValue(done)
 
-        # Add plot widget to plot list and layout
-        self.plot.append(newplot)
-        self.grid.addWidget(newplot, len(self.plot), 0, 1, 4)
+    @pyqtSlot()
+    def loader_finished(self):
+        if self.is_current_loader():
+            self.loading_finished()
+
+    @pyqtSlot()
+    def loading_finished(self):
+        # Close the progress dialog and let go of the loader
+        self.suggest_y_limit()
+        if self.progress is not None:
+            self.progress.reset()
+            self.progress.deleteLater()
+            self.progress = None
+        if self.loader is not None:
+            self.loader.deleteLater()
+            self.loader = None
+
+    @pyqtSlot()
+    def cancel_loading(self):
+        # Stop a batch of files that is still loading
+        if self.loader is not None:
+            self.loader.cancel()
+        self.loading_finished()
+
+    def insert_plot(self, fileName, data, summary=None):
+        summary = summarize(data[0]) if summary is None else summary
+
+        # Add the trace, labelled with the sac file, to the trace list
+        trace = TraceData(summary, data[1], data[2], str(fileName))
+        trace.set_trend(self.trend_of(trace))
+        self.trace_list.add_trace(trace)
+        if self.stacked:
+            self.stacked_plot.add_trace(trace)
 
         # Update the class variables that hold the minimum and
         # maximum x-values with the new values found from
@@ -53,6 +217,18 @@ class CentralWidget(QWidget):
         # Call the function to sync or not based on user input
         self.sync_toggled(self.parentWidget().sync_is_checked())
 
+    def show_traces(self, traces):
+        """
+        Replace the plots with traces that are already decoded.
+
+        :param list traces: (filename, (data, summary)) pairs
+        """
+        self.cancel_loading()
+        self.remove_plots()
+        for fileName, (data, summary) in traces:
+            self.insert_plot(fileName, data, summary)
+        self.suggest_y_limit()
+
     def add_plot(self):
         # Get a file from the user and add that file to the label of files
         fileName = QFileDialog.getOpenFileName(
@@ -63,34 +239,34 @@ class CentralWidget(QWidget):
 
     def sync_toggled(self, checked):
         # What to do if sync is toggled on or off
+        for p in self.plot:
+            self.sync_plot(p, checked)
+
+    def sync_plot(self, p, checked):
+        # Set the axes of one plot for sync on or off
         if checked:
-            if self.y_min == 0 and self.yMax == 0:
-                for p in self.plot:
-                    p.set_axes_semi_auto(
-                        self.x_min,
-                        self.x_max,
-                        qwt.QwtPlot.xBottom,
-                        qwt.QwtPlot.yLeft,
-                    )
+            if self.y_min == 0 and self.y_max == 0:
+                p.set_axes_semi_auto(
+                    self.x_min,
+                    self.x_max,
+                    qwt.QwtPlot.xBottom,
+                    qwt.QwtPlot.yLeft,
+                )
             else:
-                for p in self.plot:
-                    p.set_axes(self.x_max, self.x_min, self.yMax, self.y_min)
-            p.get_zoomer().setZoomBase()
+                p.set_axes(self.x_max, self.x_min, self.y_max, self.y_min)
         #                p.bottom_plot(False)
         #            self.plot[-1].bottom_plot(True)
         else:
-            if self.y_min == 0 and self.yMax == 0:
-                for p in self.plot:
-                    p.set_axes_auto()
+            if self.y_min == 0 and self.y_max == 0:
+                p.set_axes_auto()
             else:
-                for p in self.plot:
-                    p.set_axes_semi_auto(
-                        self.y_min,
-                        self.yMax,
-                        qwt.QwtPlot.yLeft,
-                        qwt.QwtPlot.xBottom,
-                    )
-            p.get_zoomer().setZoomBase()
+                p.set_axes_semi_auto(
+                    self.y_min,
+                    self.y_max,
+                    qwt.QwtPlot.yLeft,
+                    qwt.QwtPlot.xBottom,
+                )
+        p.get_zoomer().setZoomBase()
 
     #                p.bottom_plot(True)
 
@@ -115,10 +291,24 @@ class CentralWidget(QWidget):
         """
         self.y_max = y_max
         self.y_min = y_min
+        self.stacked_plot.set_y_limit(y_max)
         self.sync_toggled(self.parentWidget().sync_is_checked())
 
     def get_y_limit(self):
-        self.y_updated.emit(self.yMax)
+        self.y_updated.emit(self.y_max)
+
+    def suggest_y_limit(self):
+        """
+        Emit the y-limit that fits every plot over the synced x-range.
+
+        This comes from the block statistics of each trace, so no samples
+        are scanned.
+        """
+        if not self.traces:
+            return
+        y_max = max(t.get_y_limit(self.x_min, self.x_max) for t in self.traces)
+        self.stacked_plot.set_y_limit(y_max)
+        self.y_updated.emit(math.ceil(y_max))
 
     @pyqtSlot()
     def show_coordinates(self, position):
@@ -126,25 +316,60 @@ class CentralWidget(QWidget):
         self.position_change.emit(position)
 
     def sync_zoom(self, rect):
-        # Sync up the zooming of each plot
+        # Sync up the zooming of each plot. The other plots only have their
+        # axes set, and are repainted together at the end of the frame
+        self.zoom_rect = rect
         for p in self.plot:
-            p.get_zoomer().zoom(rect)
+            if p.get_zoomer() is not self.sender():
+                p.show_rect(rect)
 
     def remove_plots(self):
         for p in self.plot:
-            p.delete_plot()
-            p.hide()
-        self.plot = []
+            self.scheduler.discard(p)
+        self.trace_list.clear()
+        self.scheduler.discard(self.stacked_plot)
+        self.stacked_plot.set_traces([])
+        self.zoom_rect = None
 
     def remove_means(self, toggled):
-        for p in self.plot:
-            if toggled:
-                p.remove_mean()
-            else:
-                p.add_mean()
+        self.set_trends(toggled, self.trend_removed)
+
+    def remove_trends(self, toggled):
+        self.set_trends(self.mean_removed, toggled)
+
+    def set_trends(self, remove_mean, remove_trend):
+        """
+        Set what is removed from every trace: the linear trend if Remove Trend
+        is checked, which takes the mean with it, otherwise the mean if Remove
+        Mean is checked.
+        """
+        self.mean_removed = remove_mean
+        self.trend_removed = remove_trend
+
+        # Traces that are off screen are updated too; only the plots on
+        # screen are repainted
+        for t in self.traces:
+            t.set_trend(self.trend_of(t))
+        self.replot_traces()
+
+    def trend_of(self, trace):
+        """Return the trend to remove from a trace, or None."""
+        if self.trend_removed:
+            return trace.get_trend(1)
+        if self.mean_removed:
+            return trace.get_trend(0)
+        return None
+
+    def replot_traces(self):
+        # Repaint whichever view is showing the traces
+        if self.stacked:
+            self.stacked_plot.request_replot()
+        else:
+            for p in self.plot:
+                p.request_replot()
 
     def has_plots(self):
-        if len(self.plot) > 0:
+        if len(self.traces) > 0:
             return True
         else:
             return False
@@ -1,15 +1,15 @@
 """Main window for Waveform Plotter."""
 
+import datetime
 import os
-import shutil
-import tempfile
 from typing import List
 
-from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtCore import QDateTime, Qt, pyqtSlot
 from PyQt6.QtGui import QAction
 from PyQt6.QtWidgets import (
     QDialog,
     QFileDialog,
+    QLabel,
     QMainWindow,
     QSizePolicy,
     QStatusBar,
@@ -17,19 +17,21 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from helpers.catalog import CatalogJob, SacCatalog
 from helpers.julday import calcday
+from helpers.rdseed import RdseedJob, extraction_answers
+from helpers.recordindex import RecordIndex
+from helpers.sacnames import SacFileIndex
+from helpers.scratchstore import ScratchStore, volume_hash
+from helpers.seedinventory import InventoryJob
+from helpers.sessionstore import SessionStore
+from helpers.windowcache import WindowCache, WindowFetch, read_trace_window
 from widgets.centralwidget import CentralWidget
 from widgets.seedinfodialog import SeedInfoDialog
 from widgets.ylimwidget import SetYLimWidget
 
-
-def remove_temp_file(path):
-    """If there was a tmp file created during the running of this program, delete it."""
-    try:
-        shutil.rmtree(path)
-    except OSError as err:
-        if err.errno != 2:  # code 2 - no such file or directory
-            raise
+# Length of the windows a directory of SAC files is paged through, in seconds
+CATALOG_INTERVAL = 60 * 60
 
 
 def get_time_rdseed_format(full_time) -> str:
@@ -63,6 +65,22 @@ def get_time_rdseed_format(full_time) -> str:
     )
 
 
+def to_datetime(q_datetime) -> datetime.datetime:
+    """Convert a QDateTime, read as UTC like the rdseed times, to a datetime."""
+    return datetime.datetime.strptime(
+        q_datetime.toString("yyyyMMddhhmmss"), "%Y%m%d%H%M%S"
+    ).replace(tzinfo=datetime.timezone.utc)
+
+
+def select_sac_files(files, checkbox_info) -> List[str]:
+    """
+    Return the files that belong to the checked channels.
+
+    @return List[str]
+    """
+    return SacFileIndex(files).select(checkbox_info)
+
+
 # Class for producing plots
 class PlotWindow(QMainWindow):
     """QMainWindow for Waveform Plotter."""
@@ -72,13 +90,27 @@ class PlotWindow(QMainWindow):
         QMainWindow.__init__(self, win_parent)
 
         # Init class variables
-        self.directory_path = ""  # temporary directory path
+        self.directory_path = ""  # folder of the SAC files of the session
+        self.sac_index = SacFileIndex()  # SAC files in that folder
+        self.scratch = ScratchStore()
         self.ylim = SetYLimWidget()
         self.start_time = None
         self.end_time = None
         self.interval_time = None
         self.checkbox_info = None
         self.seed_name = None
+        self.volume_hash = None
+        self.inventory = None
+        self.record_index = None
+        self.catalog = None
+        self.jobs = []
+        self.window = None
+        self.window_cache = WindowCache()
+        self.fetches = {}
+        self.session = None
+        self.session_job = None
+        self.session_key = None
+        self.session_scratch_key = None
 
         # Init the main window
         self._create_menu_bar()
@@ -101,6 +133,10 @@ class PlotWindow(QMainWindow):
             "Mouse movements in the plots are shown in the status bar"
         )
 
+        # Replots of the last frame, next to the messages
+        self.render_label = QLabel()
+        statusbar.addPermanentWidget(self.render_label)
+
     def _create_toolbar(self) -> None:
         next_plot_action = QAction("&Next Plot", self)
         next_plot_action.setShortcut("Alt+N")
@@ -111,6 +147,12 @@ class PlotWindow(QMainWindow):
         previous_plot_action.setShortcut("Alt+P")
         previous_plot_action.setStatusTip("Show previous set of plots")
         previous_plot_action.triggered.connect(self.previous_clicked)
+
+        self.cancel_action = QAction("&Cancel", self)
+        self.cancel_action.setShortcut("Esc")
+        self.cancel_action.setStatusTip("Stop reading the SEED file")
+        self.cancel_action.setEnabled(False)
+        self.cancel_action.triggered.connect(self.cancel_jobs)
         # Add toolbar to QMainWindow
         toolbar = QToolBar("ToolBar")
 
@@ -126,6 +168,7 @@ class PlotWindow(QMainWindow):
         toolbar.addAction(self.add_plot_action)
         toolbar.addAction(previous_plot_action)
         toolbar.addAction(next_plot_action)
+        toolbar.addAction(self.cancel_action)
         self.addToolBar(Qt.ToolBarArea.BottomToolBarArea, toolbar)
 
     def _create_menu_bar(self) -> None:
@@ -134,20 +177,40 @@ class PlotWindow(QMainWindow):
         menubar = self.menuBar()
 
         # Actions for the Edit Menu
-        sync_action = QAction("S&ync", self)
-        sync_action.setShortcut("Ctrl+Y")
-        sync_action.setStatusTip("Check to sync the plots")
-        sync_action.setCheckable(True)
-        sync_action.setChecked(True)
+        self.sync_action = QAction("S&ync", self)
+        self.sync_action.setShortcut("Ctrl+Y")
+        self.sync_action.setStatusTip("Check to sync the plots")
+        self.sync_action.setCheckable(True)
+        self.sync_action.setChecked(True)
         # self.syncAction.toggled.connect(self.central_widget.sync_toggled)
 
-        remove_mean_action = QAction("Remove &Mean", self)
-        remove_mean_action.setShortcut("Ctrl+M")
-        remove_mean_action.setStatusTip("Remove Mean from Plots")
-        remove_mean_action.setCheckable(True)
-        remove_mean_action.setChecked(True)
+        self.remove_mean_action = QAction("Remove &Mean", self)
+        self.remove_mean_action.setShortcut("Ctrl+M")
+        self.remove_mean_action.setStatusTip("Remove Mean from Plots")
+        self.remove_mean_action.setCheckable(True)
+        self.remove_mean_action.setChecked(True)
         # self.removeMeanAction.toggled.connect(self.central_widget.remove_means)
 
+        self.remove_trend_action = QAction("Remove &Trend", self)
+        self.remove_trend_action.setShortcut("Ctrl+T")
+        self.remove_trend_action.setStatusTip("Remove Linear Trend from Plots")
+        self.remove_trend_action.setCheckable(True)
+
+        self.stacked_action = QAction("Stac&k Traces", self)
+        self.stacked_action.setShortcut("Ctrl+K")
+        self.stacked_action.setStatusTip("Draw all traces in a single plot")
+        self.stacked_action.setCheckable(True)
+
+        self.background_action = QAction("&Background Rendering", self)
+        self.background_action.setStatusTip("Draw the traces in worker threads")
+        self.background_action.setCheckable(True)
+
+        self.extract_once_action = QAction("Extract &Once", self)
+        self.extract_once_action.setStatusTip(
+            "Extract the whole SEED file once and page through it in memory"
+        )
+        self.extract_once_action.setCheckable(True)
+
         exit_action = QAction("&Exit", self)
         exit_action.setShortcut("Ctrl+Q")
         exit_action.setStatusTip("Exit application")
@@ -158,17 +221,27 @@ class PlotWindow(QMainWindow):
         import_seed_action.setStatusTip("Import a SEED file")
         import_seed_action.triggered.connect(self.import_seed)
 
+        open_directory_action = QAction("Open SAC &Directory", self)
+        open_directory_action.setShortcut("Ctrl+D")
+        open_directory_action.setStatusTip("Page through a directory of SAC files")
+        open_directory_action.triggered.connect(self.open_directory)
+
         # File Menu
         file_menu = menubar.addMenu("&File")
         file_menu.addAction(import_seed_action)
+        file_menu.addAction(open_directory_action)
         file_menu.addSeparator()
         file_menu.addAction(exit_action)
 
         # Edit Menu
         edit_menu = menubar.addMenu("&Edit")
         edit_menu.addAction(self.add_plot_action)
-        edit_menu.addAction(sync_action)
-        edit_menu.addAction(remove_mean_action)
+        edit_menu.addAction(self.sync_action)
+        edit_menu.addAction(self.remove_mean_action)
+        edit_menu.addAction(self.remove_trend_action)
+        edit_menu.addAction(self.stacked_action)
+        edit_menu.addAction(self.background_action)
+        edit_menu.addAction(self.extract_once_action)
 
     @property
     def add_plot_action(self) -> QAction:
@@ -188,6 +261,18 @@ class PlotWindow(QMainWindow):
         # )
 
         self.ylim.set_clicked.connect(self.set_clicked)
+        self.central_widget.y_updated.connect(self.update_ylim)
+        self.central_widget.rendered.connect(self.show_render_stats)
+        self.central_widget.load_failed.connect(self.show_load_error)
+        self.remove_mean_action.toggled.connect(self.central_widget.remove_means)
+        self.remove_trend_action.toggled.connect(self.central_widget.remove_trends)
+        self.central_widget.set_trends(
+            self.remove_mean_action.isChecked(), self.remove_trend_action.isChecked()
+        )
+        self.stacked_action.toggled.connect(self.central_widget.set_stacked)
+        self.background_action.toggled.connect(
+            self.central_widget.set_background_rendering
+        )
 
     @pyqtSlot()
     def next_clicked(self) -> None:
@@ -209,13 +294,18 @@ class PlotWindow(QMainWindow):
         """Control what happens when the program is closed."""
         # pylint: disable=invalid-name
 
-        # Delete tmp file
-        remove_temp_file(self.directory_path)
+        # Stop the extractions still running; what was extracted stays in
+        # the scratch store for the next session
+        for fetch in self.fetches.values():
+            fetch.cancel()
+        if self.session_job is not None:
+            self.session_job.cancel()
+        self.close_catalog()
 
         # Accept the close event to close the application
         event.accept()
 
-    @pyqtSlot()
+    @pyqtSlot(int)
     def update_ylim(self, y_max) -> None:
         """Update the value found in the ylim widget."""
         self.ylim.set_line_value(y_max)
@@ -251,33 +341,216 @@ class PlotWindow(QMainWindow):
             "x = " + str(position.x()) + " y = " + str(position.y())
         )
 
-    def create_sac_files(self) -> None:
-        """Create SAC files."""
-        starttime = self.get_time_rdseed_format(
-            self.start_time.toString("yyyyMMddhhmmss")
+    @pyqtSlot(str, str)
+    def show_load_error(self, filename, error) -> None:
+        """Report a SAC file that could not be loaded."""
+        self.statusBar().showMessage(f"Could not load {filename}: {error}")
+
+    @pyqtSlot(int, int)
+    def show_render_stats(self, plots, collapsed) -> None:
+        """
+        Show how many plots the last frame repainted, and how many replot
+        requests have been merged since the program started.
+        """
+        self.render_label.setText(
+            f"{plots} plots repainted, {collapsed} replots merged"
+        )
+
+    def start_job(self, job, message) -> None:
+        """
+        Start a job, such as an RdseedJob, showing its progress in the
+        status bar.
+
+        Any number of jobs can run at once; the cancel action stops them all.
+        """
+        self.jobs.append(job)
+        job.progress.connect(
+            lambda count: self.statusBar().showMessage(f"{message}: {count} files")
+        )
+        job.finished.connect(lambda ok: self.job_finished(job, ok))
+        self.statusBar().showMessage(message)
+        self.cancel_action.setEnabled(True)
+        job.start()
+
+    def job_finished(self, job, ok) -> None:
+        """Forget a job that has exited."""
+        if job in self.jobs:
+            self.jobs.remove(job)
+        self.cancel_action.setEnabled(bool(self.jobs))
+        if not ok and not job.cancelled and job.error.strip():
+            self.statusBar().showMessage(job.error.strip().splitlines()[-1])
+        job.deleteLater()
+
+    @pyqtSlot()
+    def cancel_jobs(self) -> None:
+        """Stop every rdseed job that is running."""
+        for job in list(self.jobs):
+            job.cancel()
+        self.statusBar().showMessage("Cancelled")
+
+    def selected_channels(self) -> str:
+        """
+        Return the codes of the checked channels, separated by spaces, for
+        rdseed; the SAC files of other stations it extracts are not plotted.
+        """
+        return " ".join(dict.fromkeys(key.channel for key in self.checkbox_info))
+
+    def window_key(self, start_time, end_time):
+        """Return the key of a time window in the window cache."""
+        return (
+            self.seed_name if self.catalog is None else self.catalog.directory,
+            start_time.toString("yyyyMMddhhmmss"),
+            end_time.toString("yyyyMMddhhmmss"),
+            tuple(self.checkbox_info or ()),
+        )
+
+    def scratch_key(self, start, end):
+        """
+        Return the key of an extraction in the scratch store.
+
+        :param str start: Start time in rdseed format, or "" for the start
+            of the SEED file
+        :param str end: End time in rdseed format, or "" for its end
+        """
+        return (self.volume_hash, self.selected_channels(), start, end)
+
+    def create_sac_files(self, start_time, end_time, message) -> WindowFetch:
+        """Start extracting and decoding the SAC files of a time window."""
+        starttime = get_time_rdseed_format(start_time.toString("yyyyMMddhhmmss"))
+        endtime = get_time_rdseed_format(end_time.toString("yyyyMMddhhmmss"))
+        channels = self.selected_channels()
+
+        checkbox_info = self.checkbox_info
+        fetch = WindowFetch(
+            self.window_key(start_time, end_time),
+            lambda files: select_sac_files(files, checkbox_info),
+            self.scratch,
+            self.scratch_key(starttime, endtime),
+            self,
+        )
+        fetch.ready.connect(self.window_ready)
+        fetch.failed.connect(self.window_failed)
+        self.fetches[fetch.key] = fetch
+
+        # The records of most volumes are decoded here, channel by channel
+        if self.record_index is not None:
+            fetch.decode(
+                self.record_index,
+                self.window_channels(start_time, end_time),
+                to_datetime(start_time),
+                to_datetime(end_time),
+            )
+            return fetch
+
+        # Windows extracted before, in this session or an earlier one, are
+        # only decoded again
+        directory = self.scratch.get(fetch.scratch_key)
+        if directory is not None:
+            fetch.load(directory)
+        else:
+            answers = extraction_answers(self.seed_name, channels, starttime, endtime)
+            self.start_job(fetch.extract(answers), message)
+        return fetch
+
+    def read_files(self, start_time, end_time, filenames, read) -> WindowFetch:
+        """
+        Start reading the parts of SAC files in a time window, off the GUI
+        thread.
+
+        :param read: Function of (filename, start, end), the times being UTC
+            datetimes, that returns the trace of the file in the window, like
+            helpers.windowcache.read_trace_window()
+        """
+        start, end = to_datetime(start_time), to_datetime(end_time)
+        fetch = WindowFetch(
+            self.window_key(start_time, end_time), None, None, None, self
         )
-        endtime = self.get_time_rdseed_format(self.end_time.toString("yyyyMMddhhmmss"))
-        collector = []
-        for info in self.checkbox_info:
-            for channel in info[1]:
-                if channel != "Null" and collector.count(channel) == 0:
-                    collector.append(channel)
-
-        channels = " ".join(collector)
-
-        rdseed = (
-            'echo "'
-            + self.seed_name
-            + "\n\n\nd\n\n\n"
-            + channels
-            + "\n\n\n\n\n\n\n\n"
-            + starttime
-            + "\n"
-            + endtime
-            + '\n\n\nQuit\n"'
-            + "| rdseed"
+        fetch.ready.connect(self.window_ready)
+        fetch.failed.connect(self.window_failed)
+        self.fetches[fetch.key] = fetch
+        fetch.read_files(filenames, lambda filename: read(filename, start, end))
+        return fetch
+
+    @pyqtSlot(object, object)
+    def window_ready(self, key, traces) -> None:
+        """Cache a decoded window, and plot it if it is the current one."""
+        self.fetches.pop(key).deleteLater()
+        self.window_cache.put(key, traces)
+        if key == self.window:
+            self.show_window(traces)
+
+    @pyqtSlot(object, str)
+    def window_failed(self, key, error) -> None:
+        self.fetches.pop(key).deleteLater()
+        if key == self.window and error.strip():
+            self.statusBar().showMessage(error.strip().splitlines()[-1])
+
+    def show_window(self, traces) -> None:
+        """Replace the plots with the traces of a window."""
+        self.statusBar().showMessage(f"Showing {len(traces)} traces")
+        self.central_widget.show_traces(traces)
+        self.central_widget.set_trends(
+            self.mean_is_checked(), self.remove_trend_action.isChecked()
         )
-        os.system(str(rdseed))
+
+    def prefetch(self) -> None:
+        """
+        Extract the windows before and after the current one in the
+        background, so that paging to them is immediate.
+        """
+        interval = self.interval_time
+        neighbours = {
+            self.window_key(start, end): (start, end)
+            for start, end in (
+                (self.end_time, self.end_time.addSecs(interval)),
+                (self.start_time.addSecs(-interval), self.start_time),
+            )
+        }
+
+        # Windows that are no longer next to the current one are not needed
+        for key in list(self.fetches):
+            if key != self.window and key not in neighbours:
+                self.fetches.pop(key).cancel()
+
+        for key, (start, end) in neighbours.items():
+            if (
+                key not in self.window_cache
+                and key not in self.fetches
+                and self.window_has_data(start, end)
+            ):
+                self.create_sac_files(start, end, "Prefetching SAC files")
+
+    def window_has_data(self, start_time, end_time) -> bool:
+        """
+        Return whether any checked channel has data in a time window, so
+        that rdseed is not run for gaps or past the end of the SEED file.
+        """
+        if self.inventory is None:
+            return True
+        return bool(self.window_channels(start_time, end_time))
+
+    def window_channels(self, start_time, end_time):
+        """Return the ChannelKey of every checked channel with data in a window."""
+        checked = set(self.checkbox_info)
+        return [
+            key
+            for key in self.inventory.channels_between(
+                to_datetime(start_time), to_datetime(end_time)
+            )
+            if key in checked
+        ]
+
+    def open_record_index(self):
+        """
+        Return the index of the data records of the SEED file, or None if
+        its windows must be extracted with rdseed, as some of its records
+        cannot be decoded here.
+        """
+        try:
+            index = RecordIndex.open(self.seed_name)
+        except (OSError, ValueError):
+            return None
+        return index if index.decodable() else None
 
     def load_sac_files(self) -> List[str]:
         """
@@ -285,16 +558,8 @@ class PlotWindow(QMainWindow):
 
         @return List[str]
         """
-        sac_files = []
-        files = os.listdir(self.directory_path)
-        for info in self.checkbox_info:
-            for channel in info[1]:
-                if channel != "Null":
-                    for file in files:
-                        if info[0] in file and channel in file:
-                            sac_files.append(file)
-
-        return sac_files
+        self.sac_index.update_directory(self.directory_path)
+        return self.sac_index.select(self.checkbox_info)
 
     def increment_time(self) -> None:
         """Increment the time."""
@@ -311,50 +576,203 @@ class PlotWindow(QMainWindow):
         """Read a seed file and get the information out of it.
         This is a slot that handles the importing of SEED files"""
 
-        self.seed_name = QFileDialog.getOpenFileName(
+        seed_name, _ = QFileDialog.getOpenFileName(
             self, "Open SEED File", ".", "SEED Files (*.seed)"
         )
 
-        if self.seed_name and self.seed_name != ("", ""):
-            # Reinitialize the central widget
-            # if self.central_widget.has_plots():
-            #     self.central_widget.remove_plots()
-            #     self.central_widget.init_class_variables()
-
-            # If a SEED file was picked by the user, open up a dialog to
-            # gather more information about what to display.
-            seed_info = SeedInfoDialog(self.seed_name, self)
-            # Connect seedInfo dialog box with slot to do something
-            seed_info.ok_clicked.connect(seed_info.accept)
-            seed_info.cancel_clicked.connect(seed_info.reject)
-            dialog_code = seed_info.exec()
-
-            if dialog_code == QDialog.Accepted:
-                self.start_time = seed_info.get_start_time_info()
-                self.end_time = seed_info.get_end_time_info()
-                self.interval_time = seed_info.get_interval_time()
-                self.checkbox_info = seed_info.get_checkbox_info()
-                self.sac_driver()
+        if seed_name:
+            self.close_catalog()
+            self.seed_name = seed_name
+            self.volume_hash = volume_hash(seed_name)
+            self.record_index = None
+            self.close_session()
+
+            # Read the stations and channels of the SEED file in the
+            # background; reopening a file reads them from its sidecar
+            job = InventoryJob(seed_name, self)
+            job.finished.connect(lambda ok: self.seed_info_read(job, ok))
+            self.start_job(job, "Reading SEED file")
+
+    def seed_info_read(self, job, ok) -> None:
+        """Ask what to display once the SEED file has been summarized."""
+        if not ok:
+            return
+        if job.inventory.start is None:
+            self.statusBar().showMessage(f"{self.seed_name} has no data records")
+            return
+
+        # If a SEED file was picked by the user, open up a dialog to
+        # gather more information about what to display.
+        seed_info = SeedInfoDialog(self.seed_name, job.inventory, self)
+        # Connect seedInfo dialog box with slot to do something
+        seed_info.ok_clicked.connect(seed_info.accept)
+        seed_info.cancel_clicked.connect(seed_info.reject)
+        dialog_code = seed_info.exec()
+
+        if dialog_code == QDialog.DialogCode.Accepted:
+            self.start_time = seed_info.get_start_time_info()
+            self.end_time = seed_info.get_end_time_info()
+            self.interval_time = seed_info.get_interval_time()
+            self.checkbox_info = seed_info.get_checkbox_info()
+            self.inventory = job.inventory
+            self.record_index = self.open_record_index()
+            self.sac_driver()
 
-    def sac_driver(self) -> None:
-        """Create tmp folder and sac files."""
-        # Remove old tmp directory
-        if self.directory_path != "":
-            remove_temp_file(self.directory_path)
+    @pyqtSlot()
+    def open_directory(self) -> None:
+        """
+        Catalog the SAC files below a directory, and page through them.
 
-        # Change directory to a temporary directory
-        self.create_temp_folder()
-        os.chdir(self.directory_path)
+        Only the headers of new or changed files are read, in the
+        background; the catalog is kept in the directory for next time.
+        """
+        directory = QFileDialog.getExistingDirectory(self, "Open SAC Directory", ".")
+        if directory:
+            self.close_catalog()
+            self.close_session()
+            self.seed_name = None
+            self.inventory = None
+            self.record_index = None
+            job = CatalogJob(directory, self)
+            job.finished.connect(lambda ok: self.catalog_scanned(job, ok))
+            self.start_job(job, "Reading SAC headers")
+
+    def catalog_scanned(self, job, ok) -> None:
+        """Show the first window of a directory once it is catalogued."""
+        if not ok:
+            return
+        self.catalog = SacCatalog(job.directory)
+        start, _ = self.catalog.span()
+        if start is None:
+            self.statusBar().showMessage(f"No SAC files in {job.directory}")
+            self.close_catalog()
+            return
+        self.interval_time = CATALOG_INTERVAL
+        self.start_time = QDateTime.fromSecsSinceEpoch(int(start), Qt.TimeSpec.UTC)
+        self.end_time = self.start_time.addSecs(self.interval_time)
+        self.sac_driver()
 
-        self.create_sac_files()
-        # for f in self.load_sac_files():
-        #     self.central_widget.new_plot(f)
+    def close_catalog(self) -> None:
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
 
-        # Remove mean from graphs if it is initially checked
-        # self.central_widget.remove_means(self.mean_is_checked())
+    def catalog_driver(self) -> None:
+        """
+        Plot the parts of the SAC files of the directory that are in the
+        current window, all timed from the start of the window.
+        """
+        self.window = self.window_key(self.start_time, self.end_time)
+        traces = self.window_cache.get(self.window)
+        if traces is not None:
+            self.show_window(traces)
+        elif self.window not in self.fetches:
+            paths = self.catalog.paths(
+                start=to_datetime(self.start_time).timestamp(),
+                end=to_datetime(self.end_time).timestamp(),
+            )
+            self.statusBar().showMessage(f"Reading {len(paths)} SAC files")
+            self.read_files(self.start_time, self.end_time, paths, read_trace_window)
 
-        os.chdir(os.getcwd())
+    def sac_driver(self) -> None:
+        """Show the current time window, extracting it if needed."""
+        if self.catalog is not None:
+            self.catalog_driver()
+            return
+        if self.extract_once_action.isChecked():
+            self.session_driver()
+            return
+
+        # Windows that were seen recently or prefetched are shown at once
+        self.window = self.window_key(self.start_time, self.end_time)
+        traces = self.window_cache.get(self.window)
+        if traces is not None:
+            self.show_window(traces)
+        elif not self.window_has_data(self.start_time, self.end_time):
+            self.show_window([])
+            self.statusBar().showMessage("No data for the selected channels")
+        elif self.window not in self.fetches:
+            self.create_sac_files(
+                self.start_time, self.end_time, "Extracting SAC files"
+            )
+        self.prefetch()
+
+    def session_driver(self) -> None:
+        """
+        Show the current time window from the SAC files of the session.
 
-    def create_temp_folder(self) -> None:
-        """Create a temporary folder for holding SAC files."""
-        self.directory_path = tempfile.mkdtemp()
+        The whole SEED file is extracted the first time, for the selected
+        channels; after that, paging only reads the window out of the SAC
+        files, in worker threads, and keeps it in the window cache.
+        """
+        key = (self.seed_name, tuple(self.checkbox_info))
+        if self.session is not None and self.session.key == key:
+            self.window = self.window_key(self.start_time, self.end_time)
+            traces = self.window_cache.get(self.window)
+            if traces is not None:
+                self.show_window(traces)
+            elif self.window not in self.fetches:
+                self.read_files(
+                    self.start_time,
+                    self.end_time,
+                    self.session.filenames,
+                    self.session.read,
+                )
+            return
+        if self.session_job is not None and self.session_key == key:
+            return
+
+        # A SEED file extracted before is mapped at once
+        self.close_session()
+        self.session_key = key
+        scratch_key = self.scratch_key("", "")
+        directory = self.scratch.get(scratch_key)
+        if directory is not None:
+            self.open_session(scratch_key, directory)
+            return
+
+        # rdseed extracts the whole span when no times are given
+        partial = self.scratch.create()
+        job = RdseedJob(
+            answers=extraction_answers(
+                self.seed_name, self.selected_channels(), "", ""
+            ),
+            directory=partial,
+            parent=self,
+        )
+        job.finished.connect(
+            lambda ok: self.session_extracted(job, ok, partial, scratch_key)
+        )
+        self.session_job = job
+        self.start_job(job, "Extracting the SEED file")
+
+    def session_extracted(self, job, ok, partial, scratch_key) -> None:
+        """Keep the SAC files of the session, and show the current window."""
+        if job is not self.session_job or not ok:
+            self.scratch.discard(partial)
+            if job is self.session_job:
+                self.session_job = None
+            return
+        self.session_job = None
+        self.open_session(scratch_key, self.scratch.commit(partial, scratch_key))
+
+    def open_session(self, scratch_key, directory) -> None:
+        """Map the SAC files of an extraction, keeping them until it ends."""
+        self.scratch.pin(scratch_key)
+        self.directory_path = directory
+        self.sac_index = SacFileIndex()
+        self.session = SessionStore(
+            self.session_key,
+            [os.path.join(directory, f) for f in self.load_sac_files()],
+        )
+        self.session_scratch_key = scratch_key
+        self.session_driver()
+
+    def close_session(self) -> None:
+        """Stop extracting the SEED file, or release the mapped SAC files."""
+        if self.session_job is not None:
+            self.session_job.cancel()
+            self.session_job = None
+        if self.session is not None:
+            self.scratch.unpin(self.session_scratch_key)
+            self.session = None
@@ -1,36 +1,33 @@
-import math
-
 import qwt
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import QRectF, Qt, pyqtSignal
 from PyQt6.QtGui import QPolygonF
 
+from helpers.tracestats import summarize
+from widgets.rastercurve import RasterCurve
+from widgets.tracecurve import TraceCurve
+from widgets.tracedata import TraceData
+
 
 class PlotWidget(qwt.QwtPlot):
     get_coordinates = pyqtSignal()
 
-    def __init__(self, data, widget_parent=None):
+    def __init__(self, data=None, widget_parent=None, summary=None):
         # Init the base class
         qwt.QwtPlot.__init__(self, widget_parent)
 
         # Init class variables
-        self.curve = qwt.QwtPlotCurve()
-        self.curve.attach(self)
-        self.x_vals = []
-        self.y_vals = []
         self.polygon = QPolygonF()
+        self.curve = TraceCurve(self.polygon)
+        self.curve.attach(self)
+        self.trace = None
+        self.background = False
+        self.scheduler = None
         self.bottomAxisVisible = False
-        self.mean = self.get_mean(data)
-        self.includesMean = True
 
         # Set background color and canvas margin
         self.setCanvasBackground(Qt.GlobalColor.white)
         self.plotLayout().setCanvasMargin(0)
 
-        # Call initializer methods
-        self.init_plot(data)
-        # self.init_picking()
-        self.init_zooming()
-
         # Plot marker
         self.d_mrk1 = qwt.QwtPlotMarker()
         self.d_mrk1.setLineStyle(qwt.QwtPlotMarker.VLine)
@@ -39,6 +36,12 @@ class PlotWidget(qwt.QwtPlot):
         )
         self.d_mrk1.attach(self)
 
+        # Call initializer methods
+        if data is not None:
+            self.init_plot(data, summary)
+        # self.init_picking()
+        self.init_zooming()
+
     # def init_picking(self):
     #     self.picker = qwt.QwtPlotPicker(
     #         qwt.QwtPlot.xBottom,
@@ -65,67 +68,158 @@ class PlotWidget(qwt.QwtPlot):
             self.canvas(),
         )
         self.zoomer.setZoomBase()
-        self.zoomer.zoomed.connect(self.parent().sync_zoom)
 
     def get_zoomer(self):
         return self.zoomer
 
-    def init_plot(self, data):
-        # Load x and y points from the data
-        b = data[1]
-        delta = data[2]
+    def init_plot(self, data, summary=None):
+        # The samples are plotted against times computed from b and delta,
+        # and the curve only ever holds the samples that are on screen
+        summary = summarize(data[0]) if summary is None else summary
+        self.set_trace(TraceData(summary, data[1], data[2]))
+
+    def set_trace(self, trace):
+        """
+        Show a trace, or nothing when trace is None.
+
+        Plots can be reused for other traces: everything specific to a trace,
+        including whether its mean is removed, lives in the TraceData.
+
+        :param widgets.tracedata.TraceData trace: Trace to show
+        """
+        # A trace that scrolls off screen keeps only its samples and pyramid
+        if self.trace is not None and self.trace is not trace:
+            self.trace.release()
+        self.trace = trace
+        if trace is None:
+            self.curve.detach()
+            self.plot_label("")
+        else:
+            self.attach_curve()
+            self.plot_label(trace.label)
+            self.update_curve()
+        self.request_replot()
+
+    def set_background(self, background) -> None:
+        """
+        Draw the trace in worker threads instead of in replot().
+
+        :param bool background: True to rasterize the curve in a QThreadPool
+        """
+        self.background = background
+        if self.trace is not None:
+            self.attach_curve()
+            self.request_replot()
+
+    def attach_curve(self) -> None:
+        # A RasterCurve draws one trace, so it is created for each trace the
+        # plot is given; a TraceCurve is kept and given the new trace
+        self.curve.detach()
+        if self.background:
+            self.curve = RasterCurve(self.trace)
+        else:
+            if not isinstance(self.curve, TraceCurve):
+                self.curve = TraceCurve(self.polygon)
+            self.curve.setData(self.trace)
+        self.curve.attach(self)
+
+    @property
+    def mean(self):
+        return self.trace.stats.mean()
+
+    @property
+    def includesMean(self):
+        # pylint: disable=invalid-name
+        return self.trace.includes_mean
+
+    def update_curve(self):
+        """
+        Pick the samples for the visible x-range again.
+
+        The plot does this by itself whenever its scales change; this is for
+        changes it does not know about, such as the canvas being resized.
+        """
+        if self.trace is not None:
+            self.trace.set_columns(self.canvas().width())
+            rect = self.visible_rect()
+            if rect is not None:
+                self.trace.setRectOfInterest(rect)
+
+    def visible_rect(self):
+        # Return the visible area of the canvas in plot coordinates, or None
+        # before the axes have been laid out for the first time
+        x_div = self.axisScaleDiv(qwt.QwtPlot.xBottom)
+        y_div = self.axisScaleDiv(qwt.QwtPlot.yLeft)
+        if x_div is None or y_div is None:
+            return None
+        return QRectF(
+            x_div.lowerBound(), y_div.lowerBound(), x_div.range(), y_div.range()
+        )
 
-        # load x values
-        self.x_vals = [i * delta + delta for i in range(len(data[0]))]
-        # shift x values by b
-        self.x_vals[:] = [i + b for i in self.x_vals]
-        # load y values
-        self.y_vals = [i for i in data[0]]
+    def resizeEvent(self, event):
+        # pylint: disable=invalid-name
+        qwt.QwtPlot.resizeEvent(self, event)
+        self.update_curve()
 
-    def get_mean(self, data):
-        return math.fsum(data[0]) / len(data[0])
+    def get_y_limit(self, x_min=None, x_max=None):
+        return self.trace.get_y_limit(x_min, x_max)
 
     def remove_mean(self):
         if self.includesMean:
-            self.includesMean = False
-            self.y_vals[:] = [x - self.mean for x in self.y_vals]
-            self.curve.setData(self.x_vals, self.y_vals)
-            self.replot()
+            self.trace.set_trend(self.trace.get_trend(0))
+            self.request_replot()
+
+    def remove_trend(self, order=1):
+        """Remove a polynomial trend (1 for linear) from the plotted trace."""
+        self.trace.set_trend(self.trace.get_trend(order))
+        self.request_replot()
 
     def add_mean(self):
+        # Put back whatever mean or trend was removed
         if not self.includesMean:
-            self.includesMean = True
-            self.y_vals[:] = [x + self.mean for x in self.y_vals]
-            self.curve.setData(self.x_vals, self.y_vals)
+            self.trace.set_trend(None)
+            self.request_replot()
+
+    def request_replot(self):
+        # Leave the replot to the scheduler, if there is one, so that
+        # several changes in a row only repaint once
+        if self.scheduler is None:
             self.replot()
+        else:
+            self.scheduler.request_replot(self)
+
+    def show_rect(self, rect):
+        """Show the area of the plot the zoomer would zoom to for a rect."""
+        rect = rect.normalized()
+        self.setAxisScale(qwt.QwtPlot.xBottom, rect.left(), rect.right())
+        self.setAxisScale(qwt.QwtPlot.yRight, rect.top(), rect.bottom())
+        self.request_replot()
 
     def set_axes(self, xMax, xMin, yMax, yMin):
         # Set axes to particular numbers
         self.setAxisScale(qwt.QwtPlot.xBottom, xMin, xMax)
         self.setAxisScale(qwt.QwtPlot.yLeft, yMin, yMax)
-        self.replot()
+        self.request_replot()
 
     def set_axes_semi_auto(self, minimum, maximum, axisIDman, axisIDauto):
         # Set only one axis from minimum to maximum and the other to auto
         self.setAxisScale(axisIDman, minimum, maximum)
         self.setAxisAutoScale(axisIDauto)
-        self.replot()
+        self.request_replot()
 
     def set_axes_auto(self):
         # Let QwtPlot automatically create axes
         self.setAxisAutoScale(qwt.QwtPlot.xBottom)
         self.setAxisAutoScale(qwt.QwtPlot.yLeft)
-        self.replot()
+        self.request_replot()
 
     def bottom_plot(self, bottom=False):
         self.bottomAxisVisible = bottom
         self.enableAxis(qwt.QwtPlot.xBottom, bottom)
-        self.replot()
+        self.request_replot()
 
     def delete_plot(self):
-        self.curve.setData([], [])
-        self.x_vals = []
-        self.y_vals = []
+        self.set_trace(None)
         self.detachItems()
 
     def plot_label(self, plotName):
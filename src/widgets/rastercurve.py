@@ -0,0 +1,173 @@
+"""Curves that are rasterized into images by worker threads."""
+
+import numpy as np
+import qwt
+from PyQt6.QtCore import QObject, QRectF, QRunnable, Qt, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter, QPen, QPolygonF
+
+from widgets.tracecurve import polygon_buffer
+
+
+class RasterSignals(QObject):
+    """Signals of a RasterTask, which is not a QObject itself."""
+
+    # Create signals
+    finished = pyqtSignal(int, QImage, name="finished")
+
+
+class RasterTask(QRunnable):
+    """Draw a polyline into a transparent image in a QThreadPool thread."""
+
+    def __init__(self, curve, generation, x_vals, y_vals, x_map, y_map, size):
+        """
+        :param RasterCurve curve: Curve the image is drawn for
+        :param int generation: Request number; the task is skipped if the
+            curve has asked for a newer image before it starts
+        :param numpy.ndarray x_vals: x-values, in plot coordinates
+        :param numpy.ndarray y_vals: y-values, in plot coordinates
+        :param tuple x_map: (s1, s2, p1, p2) of the x scale map
+        :param tuple y_map: (s1, s2, p1, p2) of the y scale map
+        :param QSize size: Size of the image in pixels
+        """
+        QRunnable.__init__(self)
+
+        # Init class variables
+        self.curve = curve
+        self.signals = curve.signals
+        self.generation = generation
+        self.x_vals = x_vals
+        self.y_vals = y_vals
+        self.x_map = x_map
+        self.y_map = y_map
+        self.size = size
+        self.pen = QPen(curve.pen)
+
+    @staticmethod
+    def to_pixels(values, scale_map, out):
+        s1, s2, p1, p2 = scale_map
+        factor = (p2 - p1) / (s2 - s1) if s1 != s2 else 0.0
+        np.subtract(values, s1, out=out)
+        out *= factor
+        out += p1
+
+    def run(self):
+        if self.generation != self.curve.generation:
+            return
+        image = QImage(self.size, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        if len(self.x_vals) > 1:
+            polygon = QPolygonF()
+            points = polygon_buffer(polygon, len(self.x_vals))
+            self.to_pixels(self.x_vals, self.x_map, points[:, 0])
+            self.to_pixels(self.y_vals, self.y_map, points[:, 1])
+            painter = QPainter(image)
+            painter.setPen(self.pen)
+            painter.drawPolyline(polygon)
+            painter.end()
+        self.signals.finished.emit(self.generation, image)
+
+
+class RasterCurve(qwt.QwtPlotItem):
+    """
+    Plot item that draws its series from an image rendered off the GUI thread.
+
+    When the plot is redrawn with different scales, a new image is requested
+    from the thread pool, and meanwhile the last finished image is stretched
+    over the area it was drawn for. The plot is replotted once the new image
+    arrives, which then only has to blit it.
+    """
+
+    def __init__(self, data, pool=None):
+        """
+        :param qwt.QwtSeriesData data: Series to draw. It must provide
+            setRectOfInterest(), xData(), yData() and boundingRect(), and a
+            ``revision`` that changes whenever its points do
+        :param QThreadPool pool: Pool to draw in, the global pool by default
+        """
+        qwt.QwtPlotItem.__init__(self)
+        self.setItemAttribute(qwt.QwtPlotItem.AutoScale, True)
+        self.setItemInterest(qwt.QwtPlotItem.ScaleInterest, True)
+
+        # Init class variables
+        self.data = data
+        self.pool = QThreadPool.globalInstance() if pool is None else pool
+        self.pen = QPen(Qt.GlobalColor.black)
+        self.generation = 0
+        self.requested = None
+        self.pending = {}
+        self.image = None
+        self.image_rect = None
+        self.signals = RasterSignals()
+        self.signals.finished.connect(self.image_ready)
+
+    def boundingRect(self):
+        # pylint: disable=invalid-name
+        return self.data.boundingRect()
+
+    def updateScaleDiv(self, x_div, y_div):
+        # pylint: disable=invalid-name
+        self.data.setRectOfInterest(
+            QRectF(x_div.lowerBound(), y_div.lowerBound(), x_div.range(), y_div.range())
+        )
+
+    def draw(self, painter, x_map, y_map, canvas_rect):
+        # Ask for a new image if the scales, the canvas or the data changed
+        left, top = canvas_rect.left(), canvas_rect.top()
+        x_pixels = (x_map.s1(), x_map.s2(), x_map.p1() - left, x_map.p2() - left)
+        y_pixels = (y_map.s1(), y_map.s2(), y_map.p1() - top, y_map.p2() - top)
+        key = (x_pixels, y_pixels, canvas_rect.size().toSize(), self.data.revision)
+        if key != self.requested:
+            self.requested = key
+            self.generation += 1
+            self.pending[self.generation] = (x_pixels, y_pixels)
+            self.pool.start(
+                RasterTask(
+                    self,
+                    self.generation,
+                    self.data.xData(),
+                    self.data.yData(),
+                    x_pixels,
+                    y_pixels,
+                    key[2],
+                )
+            )
+
+        # Show the last finished image where its area is now
+        if self.image is not None:
+            x_min, x_max, y_min, y_max = self.image_rect
+            target = QRectF(
+                x_map.transform(x_min),
+                y_map.transform(y_max),
+                x_map.transform(x_max) - x_map.transform(x_min),
+                y_map.transform(y_min) - y_map.transform(y_max),
+            )
+            painter.drawImage(target, self.image)
+
+    def image_ready(self, generation, image):
+        # Keep the image if it is still the newest one requested; older ones
+        # finishing late are dropped, and tasks that were skipped are forgotten
+        if generation < self.generation:
+            self.pending.pop(generation, None)
+            return
+        area = self.pending.pop(generation, None)
+        if area is None:
+            return
+        x_pixels, y_pixels = area
+        self.pending.clear()
+        self.image = image
+        self.image_rect = self.image_area(x_pixels, y_pixels, image)
+        plot = self.plot()
+        if plot is not None:
+            plot.request_replot()
+
+    @staticmethod
+    def image_area(x_pixels, y_pixels, image):
+        # Return the plot coordinates (x_min, x_max, y_min, y_max) covered by
+        # an image drawn with these maps
+        def to_scale(pixel, scale_map):
+            s1, s2, p1, p2 = scale_map
+            return s1 + (pixel - p1) * ((s2 - s1) / (p2 - p1)) if p1 != p2 else s1
+
+        x_vals = (to_scale(0, x_pixels), to_scale(image.width(), x_pixels))
+        y_vals = (to_scale(0, y_pixels), to_scale(image.height(), y_pixels))
+        return (min(x_vals), max(x_vals), min(y_vals), max(y_vals))
@@ -0,0 +1,62 @@
+"""Coalesce replots of the plots in the central widget."""
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Time to wait for more changes before repainting, about one frame at 60 Hz
+FRAME_INTERVAL = 16
+
+
+class RenderScheduler(QObject):
+    """
+    Batch the replots requested by a set of plots.
+
+    Plots ask for a replot with request_replot() instead of calling replot()
+    themselves. Requests made within a frame are merged, so each plot is
+    repainted at most once per frame however many axis or data changes it
+    went through.
+    """
+
+    # Create signals
+    flushed = pyqtSignal(int, int, name="flushed")
+
+    def __init__(self, parent=None):
+        # Init the base class
+        QObject.__init__(self, parent)
+
+        # Init class variables
+        self.pending = {}
+        self.requested = 0
+        self.replotted = 0
+        self.discarded = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FRAME_INTERVAL)
+        self.timer.timeout.connect(self.flush)
+
+    @property
+    def collapsed(self) -> int:
+        """Return the number of replot requests that were merged away."""
+        return self.requested - self.replotted - self.discarded - len(self.pending)
+
+    def request_replot(self, plot) -> None:
+        """Replot a plot at the end of the current frame."""
+        self.requested += 1
+        self.pending[plot] = None
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def discard(self, plot) -> None:
+        """Drop a pending replot, e.g. for a plot that is being removed."""
+        if plot in self.pending:
+            del self.pending[plot]
+            self.discarded += 1
+
+    def flush(self) -> None:
+        """Replot every plot with a pending request."""
+        self.timer.stop()
+        plots = list(self.pending)
+        self.pending.clear()
+        for plot in plots:
+            plot.replot()
+        self.replotted += len(plots)
+        self.flushed.emit(len(plots), self.collapsed)
@@ -1,7 +1,6 @@
 """Dialog box for display information read from SEED file."""
 
 import os
-import tempfile
 
 from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtWidgets import (
@@ -9,10 +8,14 @@ from PyQt6.QtWidgets import (
     QDialogButtonBox,
     QGridLayout,
     QGroupBox,
+    QLineEdit,
+    QTreeView,
     QVBoxLayout,
 )
 
-from widgets.stationcheckbox import StationCheckBox
+from helpers.sacnames import SacFileIndex
+from helpers.seedinventory import rdseed_time
+from widgets.stationmodel import StationFilter, StationModel
 from widgets.timeselector import TimeSelector
 
 
@@ -21,7 +24,7 @@ class SeedInfoDialog(QDialog):
     ok_clicked = pyqtSignal(name="ok_clicked")
     cancel_clicked = pyqtSignal(name="cancel_clicked")
 
-    def __init__(self, seedName, dialog_parent=None):
+    def __init__(self, seedName, inventory, dialog_parent=None):
         # Init the base class
         QDialog.__init__(self, dialog_parent)
 
@@ -30,14 +33,15 @@ class SeedInfoDialog(QDialog):
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
         )
 
-        # List containing station info read from rdseed, and a list of
-        # StationCheckBox objects
-        self.stationInfo = []
-        self.stationCheckBoxes = []
+        # Inventory of the SEED file, and the model of its stations and
+        # channels shown in a tree view
+        self.inventory = None
+        self.stationModel = None
         self.seedName = seedName
 
-        # Call function to retrieve SEED file header information
-        self.get_seed_info(self.seedName)
+        # Call function to gather the stations and channels of the SEED
+        # file, as read by helpers.seedinventory
+        self.get_seed_info(inventory)
 
         # Call functions to create and display dialog box
         self.create_widgets()
@@ -71,36 +75,12 @@ class SeedInfoDialog(QDialog):
         return self.timeSelector.get_interval_time()
 
     def get_checkbox_info(self):
-        checkBoxInfo = []
-        for s in self.stationCheckBoxes:
-            checkBoxInfo.append(s.get_checked_channels())
-        return checkBoxInfo
+        return self.stationModel.checked_channels()
 
     def get_sac_files(self, directory):
-        sacFiles = []
-        seedName = self.get_seed_name()
-        starttime = self.get_start_time_info()
-        endtime = self.get_end_time_info()
-        rdseed = (
-            'echo "'
-            + seedName
-            + "\n\n\nd\n\n\n\n\n\n\n\n\n\n\n"
-            + starttime
-            + "\n"
-            + endtime
-            + '\n\n\nQuit\n"'
-            + "| rdseed"
-        )
-        os.system(str(rdseed))
-        files = os.listdir(directory)
-        for cb in self.get_checkbox_info():
-            for channel in cb[1]:
-                if channel != "Null":
-                    for f in files:
-                        if cb[0] in f and channel in f:
-                            sacFiles.append(f)
-
-        return sacFiles
+        # Return the SAC files of the checked channels that rdseed has
+        # extracted into directory
+        return SacFileIndex(os.listdir(directory)).select(self.get_checkbox_info())
 
     def get_seed_name(self):
         return self.seedName
@@ -112,21 +92,31 @@ class SeedInfoDialog(QDialog):
 
         # Add TimeSelector widget to dialog
         self.timeSelector = TimeSelector(
-            self.stationInfo[0][3], self.stationInfo[0][6], self
+            rdseed_time(self.inventory.start), rdseed_time(self.inventory.end), self
         )
         grid_layout.addWidget(self.timeSelector, row, 0)
         row = row + 1
 
-        # Add StationCheckBox widget to dialog
+        # Add the station tree and its filter to dialog
         # Add these widgets to a groupbox
         group_box = QGroupBox("Select Stations and Channels", self)
         gb_layout = QVBoxLayout()
 
-        for s in self.stationInfo:
-            sta = StationCheckBox(s[0], s[1], s[8], s[15], self)
-            self.stationCheckBoxes.append(sta)
-            gb_layout.addWidget(sta)
-            row = row + 1
+        self.stationModel = StationModel.from_inventory(self.inventory, self)
+        self.stationFilter = StationFilter(self)
+        self.stationFilter.setSourceModel(self.stationModel)
+        self.filterEdit = QLineEdit(self)
+        self.filterEdit.setPlaceholderText("Filter stations and channels")
+        self.filterEdit.setClearButtonEnabled(True)
+        self.filterEdit.textChanged.connect(self.stationFilter.set_text)
+        gb_layout.addWidget(self.filterEdit)
+
+        self.stationView = QTreeView(self)
+        self.stationView.setHeaderHidden(True)
+        self.stationView.setUniformRowHeights(True)
+        self.stationView.setModel(self.stationFilter)
+        gb_layout.addWidget(self.stationView)
+        row = row + 1
 
         group_box.setLayout(gb_layout)
         grid_layout.addWidget(group_box)
@@ -137,66 +127,7 @@ class SeedInfoDialog(QDialog):
         # Set this dialog's layout to the grid layout
         self.setLayout(grid_layout)
 
-    def get_seed_info(self, seedName):
-        # Set rdseed output file name
-        f = tempfile.NamedTemporaryFile("rw")
-
-        # Make the command that is used to call rdseed
-        command = "rdseed -c -f " + seedName + " > " + f.name
-        os.system(str(command))
-
-        # Remove rdseed error file
-        for log in os.listdir(os.getcwd()):
-            if "rdseed.err_log" in log:
-                os.remove(log)
-
-        # Open up the file created by rdseed and gather necessary information
-        # f = open(infoFileName, 'r')
-        i = iter(f.readlines())
-        data = []
-        data2 = []
-        while True:
-            try:
-                line = i.next()
-                if not line.startswith("#"):
-                    data.append(line)
-            except StopIteration:
-                break
-
-        for d in data:
-            if len(d) == 105:
-                data2.append(d.strip().split())
-
-        self.reorganize_station_info(data2)
-        f.close()
-
-    def reorganize_station_info(self, data):
-        # --- Future work: Create an object instead of list? ---
-
-        # Reorganizes the stationInfo list into the following format:
-        # sta, cha, net, loc, start time, end time, sample rate, tot samples,
-        # cha, net, loc, start time, end time, sample rate, tot samples,
-        # cha, net, loc, start time, end time, sample rate, tot samples,
-        station = []
-        staName = str(data[0][1])
-        station.append(staName)
-        for d in data:
-            if staName != str(d[1]):
-                self.stationInfo.append(station)
-                station = []
-                staName = str(d[1])
-                station.append(staName)
-
-            if "LOG" not in d[2]:
-                if station.count(d[2]) != 0:
-                    station[3] = sorted([station[3], d[4]])[0]
-                    station[6] = sorted([station[6], d[7]])[-1]
-                else:
-                    station.append(str(d[2]))
-                    station.append(str(d[3]))
-                    station.append(str(d[4]))
-                    station.append(str(d[5]))
-                    station.append(str(d[6]))
-                    station.append(str(d[7]))
-                    station.append(str(d[8]))
-        self.stationInfo.append(station)
+    def get_seed_info(self, inventory):
+        # Keep the stations and channels of the SEED file, as read by
+        # helpers.seedinventory
+        self.inventory = inventory
@@ -0,0 +1,197 @@
+"""Single plot that draws every trace stacked on one shared time axis."""
+
+import numpy as np
+import qwt
+from PyQt6.QtCore import QPointF, QRectF, Qt
+
+from widgets.rastercurve import RasterCurve
+from widgets.tracecurve import TraceCurve
+
+
+class StackedTrace(qwt.QwtSeriesData):
+    """
+    Curve data that places a trace in its row of a StackedPlot.
+
+    The samples come from the TraceData; only their y-values are mapped, as
+    ``value * scale * plot.y_scale + offset``, when the curve asks for them.
+    """
+
+    def __init__(self, trace, plot, offset):
+        """
+        :param widgets.tracedata.TraceData trace: Trace to draw
+        :param StackedPlot plot: Plot that holds the shared y-scale
+        :param float offset: Centre of the trace's row
+        """
+        qwt.QwtSeriesData.__init__(self)
+
+        # Init class variables
+        self.trace = trace
+        self.plot = plot
+        self.offset = offset
+        self.scale = 1.0
+
+    @property
+    def gain(self) -> float:
+        return self.scale * self.plot.y_scale
+
+    @property
+    def revision(self):
+        # Changes whenever the points of the curve do, for RasterCurve
+        return (self.gain, self.offset, self.trace.trend, self.trace.cache_revision)
+
+    def setRectOfInterest(self, rect):
+        # pylint: disable=invalid-name
+        # Only the time range matters to the trace. The trace may also be
+        # bound to a plot of the trace list, so claim its resolution first
+        self.trace.set_columns(self.plot.canvas().width())
+        self.trace.setRectOfInterest(rect)
+
+    def size(self):
+        return self.trace.size()
+
+    def sample(self, i):
+        point = self.trace.sample(i)
+        return QPointF(point.x(), point.y() * self.gain + self.offset)
+
+    def fill_points(self, points, first, stop) -> None:
+        """Write points first to stop into points, as TraceData does."""
+        self.trace.fill_points(points, first, stop)
+        y_out = points[:, 1]
+        np.multiply(y_out, self.gain, out=y_out)
+        np.add(y_out, self.offset, out=y_out)
+
+    def xData(self):
+        # pylint: disable=invalid-name
+        return self.trace.xData()
+
+    def yData(self):
+        # pylint: disable=invalid-name
+        return self.trace.yData() * self.gain + self.offset
+
+    def boundingRect(self):
+        # pylint: disable=invalid-name
+        rect = self.trace.boundingRect()
+        return QRectF(rect.left(), self.offset - 0.5, rect.width(), 1.0)
+
+
+class TraceScaleDraw(qwt.QwtScaleDraw):
+    """Left axis that names the trace drawn in each row."""
+
+    def __init__(self, plot):
+        qwt.QwtScaleDraw.__init__(self)
+        self.plot = plot
+
+    def label(self, value):
+        row = -round(value)
+        if abs(value + row) > 1e-6 or not 0 <= row < len(self.plot.stacked):
+            return qwt.QwtText("")
+        return qwt.QwtText(self.plot.stacked[row].trace.label)
+
+
+class StackedPlot(qwt.QwtPlot):
+    """
+    Plot that draws all traces in one canvas, one row per trace.
+
+    Row i is centred on y = -i and is one unit high. The traces share the
+    time axis and a single zoomer, so there is nothing to synchronize, and
+    the y-limit is one number: changing it rescales every trace with a
+    single replot.
+    """
+
+    def __init__(self, widget_parent=None):
+        # Init the base class
+        qwt.QwtPlot.__init__(self, widget_parent)
+
+        # Init class variables
+        self.stacked = []
+        self.curves = []
+        self.scheduler = None
+        self.y_limit = 1.0
+        self.background = False
+
+        # Set background color, canvas margin and the trace names
+        self.setCanvasBackground(Qt.GlobalColor.white)
+        self.plotLayout().setCanvasMargin(0)
+        self.setAxisScaleDraw(qwt.QwtPlot.yLeft, TraceScaleDraw(self))
+
+        self.zoomer = qwt.QwtPlotZoomer(
+            qwt.QwtPlot.xBottom,
+            qwt.QwtPlot.yLeft,
+            qwt.QwtPicker.DragSelection,
+            qwt.QwtPicker.AlwaysOff,
+            self.canvas(),
+        )
+
+    def get_zoomer(self):
+        return self.zoomer
+
+    @property
+    def y_scale(self) -> float:
+        # A sample of y_limit reaches half a row away from the row's centre
+        return 0.5 / self.y_limit
+
+    def set_background(self, background) -> None:
+        """
+        Draw the curves in worker threads instead of in replot().
+
+        :param bool background: True to rasterize the curves in a QThreadPool
+        """
+        self.background = background
+        self.set_traces([s.trace for s in self.stacked])
+
+    def set_traces(self, traces) -> None:
+        """Draw traces, replacing the ones that are drawn now."""
+        for curve in self.curves:
+            curve.detach()
+        self.stacked = []
+        self.curves = []
+        for trace in traces:
+            self.add_trace(trace)
+
+    def add_trace(self, trace) -> None:
+        """Draw a trace in a new row below the others."""
+        stacked = StackedTrace(trace, self, -len(self.stacked))
+        trace.set_columns(self.canvas().width())
+        if self.background:
+            curve = RasterCurve(stacked)
+        else:
+            curve = TraceCurve()
+            curve.setData(stacked)
+        curve.attach(self)
+        self.stacked.append(stacked)
+        self.curves.append(curve)
+        self.reset_axes()
+
+    def set_trace_scale(self, row, scale) -> None:
+        """Magnify one trace relative to the shared y-limit."""
+        self.stacked[row].scale = scale
+        self.request_replot()
+
+    def set_y_limit(self, y_max) -> None:
+        """Set the amplitude that fills half a row, for every trace."""
+        if y_max > 0:
+            self.y_limit = float(y_max)
+            self.request_replot()
+
+    def reset_axes(self) -> None:
+        # Show every row over the time span of all traces
+        if self.stacked:
+            rects = [s.boundingRect() for s in self.stacked]
+            x_min = min(r.left() for r in rects)
+            x_max = max(r.right() for r in rects)
+            self.setAxisScale(qwt.QwtPlot.xBottom, x_min, x_max)
+        self.setAxisScale(qwt.QwtPlot.yLeft, 0.5 - len(self.stacked), 0.5, 1.0)
+        self.zoomer.setZoomBase()
+        self.request_replot()
+
+    def resizeEvent(self, event):
+        # pylint: disable=invalid-name
+        qwt.QwtPlot.resizeEvent(self, event)
+        for stacked in self.stacked:
+            stacked.trace.set_columns(self.canvas().width())
+
+    def request_replot(self):
+        if self.scheduler is None:
+            self.replot()
+        else:
+            self.scheduler.request_replot(self)
@@ -0,0 +1,234 @@
+"""Tree model of the stations and channels to extract from a SEED file."""
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, QSortFilterProxyModel, Qt
+
+# Flags of every station and channel row
+ITEM_FLAGS = (
+    Qt.ItemFlag.ItemIsEnabled
+    | Qt.ItemFlag.ItemIsSelectable
+    | Qt.ItemFlag.ItemIsUserCheckable
+)
+
+
+class StationNode:
+    """A station and the check state of each of its channels."""
+
+    def __init__(self, row, network, station, channels):
+        self.row = row
+        self.network = network
+        self.station = station
+        self.channels = list(channels)
+        self.label = f"{network}.{station}"
+
+        # Channels are shown with their location code, when they have one
+        self.channel_labels = [
+            f"{c.location}.{c.channel}" if c.location else c.channel
+            for c in self.channels
+        ]
+
+        # The Z channels are checked by default, or the last channel if there
+        # is no Z channel
+        vertical = [c.channel.endswith("Z") for c in self.channels]
+        self.checked = vertical if any(vertical) else [False] * len(self.channels)
+        if self.channels and not any(vertical):
+            self.checked[-1] = True
+
+        # Channel rows are only added to the model when the station is expanded
+        self.fetched = 0
+
+    def check_state(self):
+        if all(self.checked):
+            return Qt.CheckState.Checked
+        if any(self.checked):
+            return Qt.CheckState.PartiallyChecked
+        return Qt.CheckState.Unchecked
+
+    def matches(self, text) -> bool:
+        return text in self.label.lower() or any(
+            text in label.lower() for label in self.channel_labels
+        )
+
+
+class StationModel(QAbstractItemModel):
+    """
+    Stations as top level rows, with their channels as checkable children.
+
+    No widget is created per station, and the channel rows of a station are
+    only added when a view asks for them (see fetchMore), so the cost of
+    showing the model does not grow with the number of stations. The check
+    state of a station follows its channels: checking a station checks all
+    of them, and a station is partially checked when only some are.
+    """
+
+    def __init__(self, stations, model_parent=None):
+        """
+        :param stations: (network, station, ChannelKeys) of every station
+        """
+        # Init the base class
+        QAbstractItemModel.__init__(self, model_parent)
+
+        # Init class variables
+        self.stations = [
+            StationNode(row, network, station, channels)
+            for row, (network, station, channels) in enumerate(stations)
+        ]
+
+    @classmethod
+    def from_inventory(cls, inventory, model_parent=None):
+        """Create the model of the channels that have data in an Inventory."""
+        stations = []
+        for (network, station), channels in inventory.station_channels().items():
+            keys = [c.key for c in channels if "LOG" not in c.channel]
+            if keys:
+                stations.append((network, station, keys))
+        return cls(stations, model_parent)
+
+    def checked_channels(self):
+        """
+        Return the checked channels of every station.
+
+        :rtype: list(helpers.seedinventory.ChannelKey)
+        """
+        return [
+            key
+            for node in self.stations
+            for key, checked in zip(node.channels, node.checked)
+            if checked
+        ]
+
+    def node(self, index):
+        """Return the StationNode of a station or channel index."""
+        if not index.isValid():
+            return None
+        parent = index.internalPointer()
+        return self.stations[index.row()] if parent is None else parent
+
+    def index(self, row, column, parent=QModelIndex()):
+        # Views ask for every row, so this is kept cheaper than hasIndex()
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if row >= len(self.stations):
+                return QModelIndex()
+            return self.createIndex(row, column)
+        node = self.stations[parent.row()]
+        if parent.internalPointer() is not None or row >= node.fetched:
+            return QModelIndex()
+        return self.createIndex(row, column, node)
+
+    def parent(self, index):  # pylint: disable=arguments-differ
+        if not index.isValid() or index.internalPointer() is None:
+            return QModelIndex()
+        return self.createIndex(index.internalPointer().row, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        # pylint: disable=invalid-name
+        if not parent.isValid():
+            return len(self.stations)
+        if parent.internalPointer() is None:
+            return self.stations[parent.row()].fetched
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        # pylint: disable=invalid-name
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        # pylint: disable=invalid-name
+        if not parent.isValid():
+            return bool(self.stations)
+        return parent.internalPointer() is None
+
+    def canFetchMore(self, parent):
+        # pylint: disable=invalid-name
+        if not parent.isValid() or parent.internalPointer() is not None:
+            return False
+        node = self.stations[parent.row()]
+        return node.fetched < len(node.channels)
+
+    def fetchMore(self, parent):
+        # pylint: disable=invalid-name
+        if not self.canFetchMore(parent):
+            return
+        node = self.stations[parent.row()]
+        self.beginInsertRows(parent, node.fetched, len(node.channels) - 1)
+        node.fetched = len(node.channels)
+        self.endInsertRows()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return ITEM_FLAGS
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.node(index)
+        station = index.internalPointer() is None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.label if station else node.channel_labels[index.row()]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            if station:
+                return node.check_state()
+            if node.checked[index.row()]:
+                return Qt.CheckState.Checked
+            return Qt.CheckState.Unchecked
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        # pylint: disable=invalid-name
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        node = self.node(index)
+        checked = Qt.CheckState(value) != Qt.CheckState.Unchecked
+        if index.internalPointer() is None:
+            node.checked = [checked] * len(node.channels)
+            station = index
+        else:
+            node.checked[index.row()] = checked
+            station = self.createIndex(node.row, 0)
+
+        # The station and its channel rows change together
+        roles = [Qt.ItemDataRole.CheckStateRole]
+        self.dataChanged.emit(station, station, roles)
+        if node.fetched:
+            self.dataChanged.emit(
+                self.index(0, 0, station),
+                self.index(node.fetched - 1, 0, station),
+                roles,
+            )
+        return True
+
+
+class StationFilter(QSortFilterProxyModel):
+    """
+    Shows the stations whose name or channels contain a text, ignoring case.
+
+    The stations are matched on the codes they hold, so channels that have
+    not been fetched yet are matched too. All the channels of a station
+    whose name matches are shown; otherwise, only the matching ones are.
+    """
+
+    def __init__(self, filter_parent=None):
+        # Init the base class
+        QSortFilterProxyModel.__init__(self, filter_parent)
+
+        # Init class variables
+        self.text = ""
+
+    def set_text(self, text) -> None:
+        self.text = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        # pylint: disable=invalid-name
+        if not self.text:
+            return True
+        model = self.sourceModel()
+        if not source_parent.isValid():
+            return model.stations[source_row].matches(self.text)
+        node = model.node(source_parent)
+        return (
+            self.text in node.label.lower()
+            or self.text in node.channel_labels[source_row].lower()
+        )
@@ -15,7 +15,7 @@ class TimeSelector(QGroupBox):
         self.init_dates_and_times(startTime, endTime)
 
         # Init the widgets
-        self.init_widgets(startTime, endTime)
+        self.init_widgets()
 
     def init_dates_and_times(self, startTime, endTime):
         # Get the start time of the seed file
@@ -0,0 +1,78 @@
+"""Curve that hands its points to the painter without per-point copies."""
+
+import numpy as np
+import qwt
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPolygonF
+
+
+def polygon_buffer(polygon, size):
+    """
+    Resize a polygon to size points and return its storage as a NumPy array.
+
+    The array has shape (size, 2) and shares memory with the polygon, so
+    writing x and y into its columns fills the polygon in place. Shrinking a
+    polygon keeps its allocation, so a polygon reused from frame to frame
+    only allocates when it has to grow.
+
+    :param QPolygonF polygon: Polygon to fill
+    :param int size: Number of points
+    :rtype: numpy.ndarray
+    """
+    polygon.resize(size)
+    if size == 0:
+        return np.empty((0, 2))
+    pointer = polygon.data()
+    pointer.setsize(16 * size)  # Two float64 values per QPointF
+    return np.frombuffer(pointer, np.float64).reshape(size, 2)
+
+
+def transform_into(values, scale_map, out) -> None:
+    """Map values to pixel coordinates, writing them into out."""
+    if scale_map.transformation() is not None:
+        out[:] = scale_map.transform(values)
+        return
+    s1, s2, p1, p2 = scale_map.s1(), scale_map.s2(), scale_map.p1(), scale_map.p2()
+    factor = (p2 - p1) / (s2 - s1) if s1 != s2 else 0.0
+    np.subtract(values, s1, out=out)
+    out *= factor
+    out += p1
+
+
+class TraceCurve(qwt.QwtPlotCurve):
+    """
+    QwtPlotCurve that draws its lines through one reusable QPolygonF.
+
+    QwtPlotCurve builds a new polygon for every frame, from one QPointF per
+    sample. Here the samples are transformed straight into the memory of a
+    polygon kept by the curve, so drawing allocates nothing once the polygon
+    is large enough. Series with a fill_points(points, first, stop) method,
+    such as TraceData, write their points into it themselves; others are
+    copied from xData() and yData().
+    """
+
+    def __init__(self, polygon=None):
+        """
+        :param QPolygonF polygon: Polygon to draw with, a new one by default
+        """
+        qwt.QwtPlotCurve.__init__(self)
+        self.polygon = QPolygonF() if polygon is None else polygon
+
+    def drawLines(self, painter, xMap, yMap, canvasRect, from_, to):
+        # pylint: disable=invalid-name
+        # Filled curves need the polygon to be closed by Qwt
+        if self.brush().style() != Qt.BrushStyle.NoBrush:
+            qwt.QwtPlotCurve.drawLines(self, painter, xMap, yMap, canvasRect, from_, to)
+            return
+        if from_ > to:
+            return
+        series = self.data()
+        points = polygon_buffer(self.polygon, to + 1 - from_)
+        if hasattr(series, "fill_points"):
+            series.fill_points(points, from_, to + 1)
+            transform_into(points[:, 0], xMap, points[:, 0])
+            transform_into(points[:, 1], yMap, points[:, 1])
+        else:
+            transform_into(series.xData()[from_ : to + 1], xMap, points[:, 0])
+            transform_into(series.yData()[from_ : to + 1], yMap, points[:, 1])
+        painter.drawPolyline(self.polygon)
@@ -0,0 +1,223 @@
+"""Curve data that follows the visible part of a trace."""
+
+import math
+
+import numpy as np
+import qwt
+from PyQt6.QtCore import QPointF, QRectF
+
+from helpers.detrend import fit_trends
+
+
+class TraceData(qwt.QwtSeriesData):
+    """
+    QwtSeriesData holding only the part of a trace that is on screen.
+
+    The trace is stored as its samples and (b, delta) alone: the time of a
+    sample is computed when it is needed, and only for the points handed to
+    the curve.
+
+    The plot calls setRectOfInterest() with the visible area before every
+    redraw. The samples inside it are taken from the min/max pyramid level
+    that has about one bin per pixel column, together with a viewport width
+    of margin on each side, so panning reuses the cached window until it
+    scrolls past the margin.
+
+    It is also everything kept of a trace that is not on screen: the samples,
+    their load-time summary and the trend that is removed from them.
+    """
+
+    def __init__(self, summary, b, delta, label=""):
+        """
+        :param helpers.tracestats.TraceSummary summary: Pyramid, trends and
+            statistics of the samples
+        :param float b: Time of the first sample
+        :param float delta: Sample interval
+        :param str label: Name shown on the plot
+        """
+        qwt.QwtSeriesData.__init__(self)
+
+        # Init class variables
+        self.pyramid = summary.pyramid
+        self.trends = summary.trends
+        self.stats = summary.stats
+        self.label = label
+        self.b = b
+        self.delta = delta
+        self.trend = None
+        self.columns = 1
+        self.cache = None
+        self.cache_revision = 0
+        self.positions = np.empty(0)
+        self.y_vals = np.empty(0)
+
+        self.y_range = (0.0, 0.0)
+        self.update_range()
+
+    @property
+    def samples(self):
+        """Return the samples of the whole trace."""
+        return self.pyramid.data
+
+    def time_of(self, position):
+        """Return the time of a (fractional) sample position."""
+        return position * self.delta + self.b
+
+    def index_at(self, time) -> int:
+        """Return the index of the sample closest to a time."""
+        index = round((time - self.b) / self.delta)
+        return min(max(index, 0), len(self.pyramid) - 1)
+
+    def get_y_limit(self, x_min=None, x_max=None) -> float:
+        """
+        Return the y-limit that fits the samples between x_min and x_max, as
+        currently plotted, from the block statistics of the trace.
+        """
+        first = 0 if x_min is None else self.index_at(x_min)
+        stop = len(self.stats) if x_max is None else self.index_at(x_max) + 1
+        offset = 0.0 if self.trend is None else self.stats.mean()
+        return self.stats.y_limit(first, stop, offset)
+
+    @property
+    def revision(self):
+        # Changes whenever the points of the curve do, for RasterCurve
+        return (self.trend, self.cache_revision)
+
+    def set_columns(self, columns) -> None:
+        """Set the width of the canvas in pixels."""
+        columns = max(columns, 1)
+        if columns != self.columns:
+            self.columns = columns
+            self.cache = None
+            self.cache_revision += 1
+
+    @property
+    def includes_mean(self) -> bool:
+        return self.trend is None
+
+    def get_trend(self, order):
+        """Return the polynomial trend of an order (0 for the mean)."""
+        # Trends of order 0 and 1 are fitted at load time, others on demand
+        if order not in self.trends:
+            self.trends.update(fit_trends(self.samples, (order,)))
+        return self.trends[order]
+
+    def set_trend(self, trend) -> None:
+        """
+        Set the trend that is removed from the trace, or None to keep it.
+
+        Only the cached window is processed: the old trend is added back and
+        the new one subtracted in place.
+
+        :param helpers.detrend.Trend trend: Trend to remove
+        """
+        if trend is self.trend:
+            return
+        if self.cache is not None:
+            positions, values = self.cache[3], self.cache[4]
+            if self.trend is not None:
+                self.trend.restore(values, positions)
+            if trend is not None:
+                trend.remove(values, positions)
+            self.cache_revision += 1
+        self.trend = trend
+        self.update_range()
+
+    def update_range(self) -> None:
+        # Bounds of the whole trace, used for autoscaling. They are taken
+        # from the coarsest pyramid level, which only has a few thousand bins
+        if len(self.pyramid) == 0:
+            return
+        positions, values = self.pyramid.envelope(len(self.pyramid.levels) - 1)
+        values = np.array(values, dtype=np.float64)
+        if self.trend is not None:
+            self.trend.remove(values, positions)
+        self.y_range = (float(np.min(values)), float(np.max(values)))
+
+    def setRectOfInterest(self, rect):
+        # pylint: disable=invalid-name
+        first = math.floor((rect.left() - self.b) / self.delta)
+        stop = math.ceil((rect.right() - self.b) / self.delta) + 1
+        self.select(first, stop)
+
+    def select(self, first, stop) -> None:
+        """
+        Make samples first to stop the current curve data.
+
+        :param int first: Index of the first visible sample
+        :param int stop: Index after the last visible sample
+        """
+        npts = len(self.pyramid)
+        first = min(max(first, 0), npts)
+        stop = min(max(stop, first), npts)
+        level = self.pyramid.level_for(stop - first, self.columns)
+
+        # Refill the cache when the zoom level changes or the window has been
+        # panned past the margin
+        if self.cache is None or not (
+            self.cache[0] == level and self.cache[1] <= first and stop <= self.cache[2]
+        ):
+            margin = stop - first
+            cache_first = max(first - margin, 0)
+            cache_stop = min(stop + margin, npts)
+            positions, values = self.pyramid.envelope(level, cache_first, cache_stop)
+            values = np.array(values, dtype=np.float64)
+            if self.trend is not None:
+                self.trend.remove(values, positions)
+            self.cache = (level, cache_first, cache_stop, positions, values)
+            self.cache_revision += 1
+
+        # Slice the visible part (plus one point either side) out of the cache
+        positions, values = self.cache[3], self.cache[4]
+        start = max(np.searchsorted(positions, first, "right") - 2, 0)
+        end = np.searchsorted(positions, stop, "left") + 2
+        self.positions = positions[start:end]
+        self.y_vals = values[start:end]
+
+    def release(self) -> None:
+        """
+        Drop the cached window, keeping only the samples and their summary.
+
+        Called when the trace leaves the screen; select() fills the cache
+        again when it is shown.
+        """
+        self.cache = None
+        self.cache_revision += 1
+        self.positions = np.empty(0)
+        self.y_vals = np.empty(0)
+
+    def size(self):
+        return len(self.positions)
+
+    def sample(self, i):
+        return QPointF(self.time_of(self.positions[i]), self.y_vals[i])
+
+    def fill_points(self, points, first, stop) -> None:
+        """
+        Write the times and values of points first to stop of the curve data
+        into the columns of points, without temporary arrays.
+
+        :param numpy.ndarray points: (stop - first, 2) array to fill
+        """
+        x_out, y_out = points[:, 0], points[:, 1]
+        np.multiply(self.positions[first:stop], self.delta, out=x_out)
+        np.add(x_out, self.b, out=x_out)
+        y_out[:] = self.y_vals[first:stop]
+
+    def xData(self):
+        # pylint: disable=invalid-name
+        return self.time_of(self.positions)
+
+    def yData(self):
+        # pylint: disable=invalid-name
+        return self.y_vals
+
+    def boundingRect(self):
+        # pylint: disable=invalid-name
+        # Bounds of the whole trace, not only of the part on screen
+        if len(self.pyramid) == 0:
+            return QRectF(1.0, 1.0, -2.0, -2.0)
+        x_min = self.time_of(0)
+        x_max = self.time_of(len(self.pyramid) - 1)
+        y_min, y_max = self.y_range
+        return QRectF(x_min, y_min, x_max - x_min, y_max - y_min)
@@ -0,0 +1,107 @@
+"""Scrollable list of traces that only keeps the visible rows as widgets."""
+
+import math
+
+from PyQt6.QtWidgets import QAbstractScrollArea
+
+
+class TraceList(QAbstractScrollArea):
+    """
+    Vertical list of traces drawn by a small pool of plot widgets.
+
+    Only the rows that are on screen have a plot widget. When the list is
+    scrolled, the widgets of the rows that left the screen are given the
+    traces of the rows that came into view, so the number of widgets depends
+    on the height of the window and not on the number of traces.
+    """
+
+    def __init__(self, create_plot, bind_plot=None, widget_parent=None):
+        """
+        :param create_plot: Function called with the viewport as parent to
+            create a new plot widget for the pool
+        :param bind_plot: Function called with a plot widget each time it is
+            given a new trace
+        """
+        # Init the base class
+        QAbstractScrollArea.__init__(self, widget_parent)
+
+        # Init class variables
+        self.create_plot = create_plot
+        self.bind_plot = bind_plot
+        self.traces = []
+        self.pool = []
+        self.min_row_height = 120
+
+        self.verticalScrollBar().valueChanged.connect(self.layout_rows)
+
+    @property
+    def row_height(self) -> int:
+        # A few traces share the height of the window, many traces scroll
+        if not self.traces:
+            return self.min_row_height
+        return max(self.min_row_height, self.viewport().height() // len(self.traces))
+
+    def visible_plots(self):
+        """Return the plot widgets that are currently showing a trace."""
+        return [p for p in self.pool if p.trace is not None]
+
+    def add_trace(self, trace) -> None:
+        self.traces.append(trace)
+        self.layout_rows()
+
+    def clear(self) -> None:
+        self.traces = []
+        self.layout_rows()
+
+    def resizeEvent(self, event):
+        # pylint: disable=invalid-name
+        QAbstractScrollArea.resizeEvent(self, event)
+        self.layout_rows()
+
+    def scrollContentsBy(self, dx, dy):
+        # pylint: disable=invalid-name
+        # The rows are placed by layout_rows(), not scrolled by the viewport
+        pass
+
+    def layout_rows(self) -> None:
+        """Give the pool widgets the traces of the rows that are on screen."""
+        row_height = self.row_height
+        height = self.viewport().height()
+
+        # Update the scroll bar for the current number of traces
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.blockSignals(True)
+        scroll_bar.setRange(0, max(len(self.traces) * row_height - height, 0))
+        scroll_bar.setPageStep(height)
+        scroll_bar.setSingleStep(max(row_height // 4, 1))
+        scroll_bar.blockSignals(False)
+        offset = scroll_bar.value()
+
+        # Rows that are at least partly on screen
+        first = offset // row_height
+        rows = min(math.ceil(height / row_height) + 1, len(self.traces) - first)
+        while len(self.pool) < rows:
+            self.pool.append(self.create_plot(self.viewport()))
+
+        # Widgets keep their trace while it stays on screen, so scrolling only
+        # rebinds the rows that came into view
+        visible = self.traces[first : first + rows]
+        free = [p for p in self.pool if p.trace is None or p.trace not in visible]
+        placed = {id(p.trace): p for p in self.pool if p not in free}
+        for row, trace in enumerate(visible, first):
+            plot = placed.get(id(trace))
+            if plot is None:
+                plot = free.pop()
+                plot.set_trace(trace)
+                if self.bind_plot is not None:
+                    self.bind_plot(plot)
+            plot.setGeometry(
+                0, row * row_height - offset, self.viewport().width(), row_height
+            )
+            plot.show()
+
+        # Widgets that are left over let go of their trace
+        for plot in free:
+            if plot.trace is not None:
+                plot.set_trace(None)
+            plot.hide()